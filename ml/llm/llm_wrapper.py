@@ -84,6 +84,21 @@ class LLMProvider(ABC):
         """Check if the provider is available."""
         pass
 
+    def generate_batch(self, prompts: list[str]) -> list[str]:
+        """
+        Generate text for several prompts.
+
+        The default implementation calls generate() once per prompt.
+        Providers that can run prompts together should override it.
+
+        Args:
+            prompts: Input prompt texts.
+
+        Returns:
+            list[str]: Generated responses, in prompt order.
+        """
+        return [self.generate(prompt) for prompt in prompts]
+
 
 class OpenAIProvider(LLMProvider):
     """OpenAI GPT-4 provider implementation."""
@@ -243,6 +258,36 @@ class HuggingFaceProvider(LLMProvider):
             logger.error(f"HuggingFace generation error: {e}")
             raise RuntimeError(f"HuggingFace generation failed: {e}")
 
+    def generate_batch(self, prompts: list[str]) -> list[str]:
+        """
+        Generate text for several prompts in one pipeline call.
+
+        Args:
+            prompts: Input prompts.
+
+        Returns:
+            list[str]: Generated responses, in prompt order.
+
+        Raises:
+            RuntimeError: If generation fails.
+        """
+        try:
+            pipe = self._get_pipeline()
+
+            results = pipe(
+                [f"[INST] {prompt} [/INST]" for prompt in prompts],
+                max_new_tokens=self.max_new_tokens,
+                temperature=self.temperature,
+                do_sample=True,
+                return_full_text=False,
+            )
+
+            return [result[0]["generated_text"] for result in results]
+
+        except Exception as e:
+            logger.error(f"HuggingFace batch generation error: {e}")
+            raise RuntimeError(f"HuggingFace batch generation failed: {e}")
+
 
 class MockProvider(LLMProvider):
     """Mock provider for testing without API calls."""
@@ -6,6 +6,7 @@ using LLM-powered content generation.
 """
 
 import logging
+import re
 from datetime import datetime
 from enum import Enum
 from typing import Optional
@@ -20,6 +21,22 @@ from llm.llm_wrapper import (
 
 logger = logging.getLogger(__name__)
 
+# Preambles LLMs commonly put before the letter body
+_RESPONSE_PREFIXES = (
+    "Here's the letter:",
+    "Here is the letter:",
+    "Below is the letter:",
+    "The letter:",
+)
+_PREFIX_RE = re.compile(
+    r"\A(?:" + "|".join(map(re.escape, _RESPONSE_PREFIXES)) + r")\s*",
+    re.IGNORECASE,
+)
+
+# Opening (with optional language tag) and closing markdown code fences
+_FENCE_OPEN_RE = re.compile(r"\A```[^\n]*\n?")
+_FENCE_CLOSE_RE = re.compile(r"(?:\A|\n)[ \t]*```[ \t]*\Z")
+
 
 class LetterTone(str, Enum):
     """Available letter tone options."""
@@ -128,14 +145,7 @@ def generate_letter(
         >>> letter = generate_letter(audit, tone="formal")
         >>> print(letter)
     """
-    # Validate tone
-    try:
-        letter_tone = LetterTone(tone.lower())
-    except ValueError:
-        valid_tones = [t.value for t in LetterTone]
-        raise ValueError(
-            f"Invalid tone '{tone}'. Must be one of: {valid_tones}"
-        )
+    letter_tone = _parse_tone(tone)
 
     logger.info(f"Generating {letter_tone.value} negotiation letter")
 
@@ -154,23 +164,109 @@ def generate_letter(
 
     try:
         # Generate letter
-        letter = provider.generate(prompt)
-
-        # Clean up response
-        letter = _clean_letter_response(letter)
-
-        # Fill in patient info if provided
-        if patient_info:
-            letter = _fill_patient_info(letter, patient_info)
-
-        logger.info("Letter generated successfully")
-        return letter
-
+        response = provider.generate(prompt)
     except Exception as e:
         logger.error(f"LLM letter generation failed: {e}")
         # Return fallback letter
         return _generate_fallback_letter(parsed_audit_json, letter_tone, patient_info)
 
+    return _finalize_letter(response, parsed_audit_json, letter_tone, patient_info)
+
+
+def generate_letters(
+    parsed_audits: list[dict],
+    tone: str = "formal",
+    provider: Optional[LLMProvider] = None,
+    patient_infos: Optional[list[Optional[dict]]] = None,
+) -> list[str]:
+    """
+    Generate negotiation letters for several audits in one provider call.
+
+    Audits with issues are sent to the provider together through
+    generate_batch(). Audits without issues get an acknowledgment letter
+    without an LLM call, as in generate_letter().
+
+    Args:
+        parsed_audits: Audit results from audit_engine.
+        tone: Letter tone applied to every letter.
+        provider: LLM provider to use. Auto-selects if None.
+        patient_infos: Optional patient details, aligned with parsed_audits.
+
+    Returns:
+        list[str]: One letter per audit, in input order.
+
+    Raises:
+        ValueError: If tone is not valid or patient_infos has the wrong length.
+    """
+    letter_tone = _parse_tone(tone)
+
+    if patient_infos is None:
+        patient_infos = [None] * len(parsed_audits)
+    elif len(patient_infos) != len(parsed_audits):
+        raise ValueError("patient_infos must match parsed_audits in length")
+
+    logger.info(
+        f"Generating {len(parsed_audits)} {letter_tone.value} negotiation letter(s)"
+    )
+
+    letters: list[Optional[str]] = [None] * len(parsed_audits)
+    pending = []
+    for i, audit in enumerate(parsed_audits):
+        if audit.get("issues", []):
+            pending.append(i)
+        else:
+            letters[i] = _generate_no_issues_letter(audit, letter_tone)
+
+    if pending:
+        if provider is None:
+            provider = _get_default_provider()
+
+        prompts = [_build_letter_prompt(parsed_audits[i], letter_tone) for i in pending]
+
+        try:
+            responses = provider.generate_batch(prompts)
+            if len(responses) != len(pending):
+                raise ValueError(
+                    f"expected {len(pending)} responses, got {len(responses)}"
+                )
+        except Exception as e:
+            logger.error(f"LLM batch letter generation failed: {e}")
+            responses = None
+
+        for j, i in enumerate(pending):
+            if responses is None:
+                letters[i] = _generate_fallback_letter(
+                    parsed_audits[i], letter_tone, patient_infos[i]
+                )
+            else:
+                letters[i] = _finalize_letter(
+                    responses[j], parsed_audits[i], letter_tone, patient_infos[i]
+                )
+
+    return letters
+
+
+def _parse_tone(tone: str) -> LetterTone:
+    """
+    Convert a tone string to a LetterTone.
+
+    Args:
+        tone: Tone name, case-insensitive.
+
+    Returns:
+        LetterTone: Matching tone.
+
+    Raises:
+        ValueError: If tone is not valid.
+    """
+    try:
+        return LetterTone(tone.lower())
+    except ValueError:
+        valid_tones = [t.value for t in LetterTone]
+        raise ValueError(
+            f"Invalid tone '{tone}'. Must be one of: {valid_tones}"
+        )
+
 
 def _build_letter_prompt(audit: dict, tone: LetterTone) -> str:
     """
@@ -226,6 +322,42 @@ def _format_issues_for_prompt(issues: list) -> str:
     return "\n".join(lines)
 
 
+def _finalize_letter(
+    response: str,
+    parsed_audit: dict,
+    tone: LetterTone,
+    patient_info: Optional[dict],
+) -> str:
+    """
+    Turn a raw LLM response into the final letter.
+
+    Cleans the response and fills in patient info; falls back to the
+    template letter if either step fails.
+
+    Args:
+        response: Raw LLM response text.
+        parsed_audit: Audit results the letter was generated from.
+        tone: Letter tone.
+        patient_info: Optional patient details to fill in.
+
+    Returns:
+        str: Finished letter text.
+    """
+    try:
+        # Clean up response
+        letter = _clean_letter_response(response)
+
+        # Fill in patient info if provided
+        if patient_info:
+            letter = _fill_patient_info(letter, patient_info)
+    except Exception as e:
+        logger.error(f"LLM letter generation failed: {e}")
+        return _generate_fallback_letter(parsed_audit, tone, patient_info)
+
+    logger.info("Letter generated successfully")
+    return letter
+
+
 def _clean_letter_response(response: str) -> str:
     """
     Clean up LLM response to extract just the letter.
@@ -237,28 +369,12 @@ def _clean_letter_response(response: str) -> str:
         str: Cleaned letter text.
     """
     # Remove common prefixes
-    prefixes_to_remove = [
-        "Here's the letter:",
-        "Here is the letter:",
-        "Below is the letter:",
-        "The letter:",
-    ]
-
-    response = response.strip()
-
-    for prefix in prefixes_to_remove:
-        if response.lower().startswith(prefix.lower()):
-            response = response[len(prefix):].strip()
+    response = _PREFIX_RE.sub("", response.strip(), count=1)
 
     # Remove markdown formatting if present
     if response.startswith("```"):
-        lines = response.split("\n")
-        # Remove first and last ``` lines
-        if lines[0].startswith("```"):
-            lines = lines[1:]
-        if lines and lines[-1].strip() == "```":
-            lines = lines[:-1]
-        response = "\n".join(lines)
+        response = _FENCE_OPEN_RE.sub("", response, count=1)
+        response = _FENCE_CLOSE_RE.sub("", response, count=1)
 
     return response.strip()
 
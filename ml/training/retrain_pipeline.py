@@ -19,7 +19,9 @@ import logging
 import os
 import pickle
 import shutil
-from dataclasses import dataclass, asdict, field
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, field, replace
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
@@ -30,7 +32,11 @@ import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.ensemble import (
+    RandomForestClassifier,
+    GradientBoostingClassifier,
+    HistGradientBoostingClassifier,
+)
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import (
     classification_report,
@@ -40,6 +46,7 @@ from sklearn.metrics import (
 )
 from sklearn.pipeline import Pipeline
 import joblib
+from joblib import Parallel, delayed
 
 # Configure logging
 logging.basicConfig(
@@ -48,8 +55,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# orjson is optional; it parses/serializes the training JSON several times faster
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
-@dataclass
+# Classifiers that reject sparse input and need TF-IDF features densified
+DENSE_MODEL_TYPES = {'hist_gradient_boosting'}
+
+# Below this many samples, per-field fits run on threads instead of worker
+# processes; spawning loky workers costs more than the fits themselves.
+PROCESS_BACKEND_MIN_SAMPLES = 5000
+
+# File name of the vectorizer shared by all field models in an output dir
+SHARED_VECTORIZER_FILENAME = "vectorizer.joblib"
+
+
+def _read_json(path: str) -> Any:
+    """Read a JSON file, using orjson when available."""
+    if HAS_ORJSON:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _write_json(path: str, data: Any) -> None:
+    """Write data as indented JSON, using orjson when available."""
+    if HAS_ORJSON:
+        Path(path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+@dataclass(slots=True, frozen=True)
 class TrainingSample:
     """A single training sample for field extraction."""
     text_context: str  # Surrounding text/OCR output
@@ -60,7 +101,7 @@ class TrainingSample:
     document_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ModelMetrics:
     """Metrics from model training/evaluation."""
     accuracy: float
@@ -95,11 +136,11 @@ class ModelArtifact:
         return data
 
 
-@dataclass
+@dataclass(slots=True)
 class RetrainingConfig:
     """Configuration for the retraining pipeline."""
     # Model settings
-    model_type: str = "random_forest"  # 'random_forest', 'gradient_boosting', 'logistic_regression'
+    model_type: str = "random_forest"  # 'random_forest', 'gradient_boosting', 'hist_gradient_boosting', 'logistic_regression'
     n_estimators: int = 100
     max_depth: Optional[int] = None
     min_samples_split: int = 2
@@ -109,6 +150,7 @@ class RetrainingConfig:
     test_size: float = 0.2
     validation_size: float = 0.1
     min_samples_per_field: int = 10
+    n_jobs: int = -1  # Parallel jobs for field fits and forest trees (-1 = all cores)
     
     # Feature extraction
     max_features: int = 5000
@@ -134,8 +176,21 @@ class FieldExtractionDataset:
     def __init__(self, config: RetrainingConfig):
         """Initialize the dataset manager."""
         self.config = config
-        self.samples: List[TrainingSample] = []
+        self._samples: List[TrainingSample] = []
         self.label_encoders: Dict[str, LabelEncoder] = {}
+        # Samples grouped by field; built lazily, reset whenever samples change
+        self._by_field: Optional[Dict[str, List[TrainingSample]]] = None
+    
+    @property
+    def samples(self) -> Tuple[TrainingSample, ...]:
+        """All loaded samples; read-only so the field index cannot go stale."""
+        return tuple(self._samples)
+    
+    @samples.setter
+    def samples(self, samples: List[TrainingSample]) -> None:
+        """Replace the samples, e.g. after filtering, and reset the field index."""
+        self._samples = list(samples)
+        self._by_field = None
     
     def load_synthetic_data(self, data_path: str) -> int:
         """
@@ -151,8 +206,7 @@ class FieldExtractionDataset:
             logger.warning(f"Synthetic data not found at {data_path}")
             return 0
         
-        with open(data_path, 'r') as f:
-            data = json.load(f)
+        data = _read_json(data_path)
         
         count = 0
         for doc in data:
@@ -173,9 +227,10 @@ class FieldExtractionDataset:
                         confidence=1.0,  # Synthetic data is ground truth
                         document_id=document_id,
                     )
-                    self.samples.append(sample)
+                    self._samples.append(sample)
                     count += 1
         
+        self._by_field = None
         logger.info(f"Loaded {count} samples from synthetic data")
         return count
     
@@ -193,8 +248,7 @@ class FieldExtractionDataset:
             logger.warning(f"HITL data not found at {data_path}")
             return 0
         
-        with open(data_path, 'r') as f:
-            data = json.load(f)
+        data = _read_json(data_path)
         
         count = 0
         for correction in data:
@@ -214,9 +268,10 @@ class FieldExtractionDataset:
                     confidence=correction.get('original_confidence', 0.5),
                     document_id=correction.get('document_id'),
                 )
-                self.samples.append(sample)
+                self._samples.append(sample)
                 count += 1
         
+        self._by_field = None
         logger.info(f"Loaded {count} samples from HITL corrections")
         return count
     
@@ -245,9 +300,10 @@ class FieldExtractionDataset:
                     source='hitl',
                     confidence=item.get('original_confidence', 0.5),
                 )
-                self.samples.append(sample)
+                self._samples.append(sample)
                 count += 1
             
+            self._by_field = None
             logger.info(f"Loaded {count} samples from database")
             return count
         except Exception as e:
@@ -295,16 +351,17 @@ class FieldExtractionDataset:
         if not self.config.augment_synthetic:
             return 0
         
-        original_count = len(self.samples)
+        original_count = len(self._samples)
         augmented_samples = []
         
-        for sample in self.samples:
+        for sample in self._samples:
             if sample.source == 'synthetic':
                 # Create variations of the text context
                 augmented = self._create_augmentations(sample)
                 augmented_samples.extend(augmented)
         
-        self.samples.extend(augmented_samples)
+        self._samples.extend(augmented_samples)
+        self._by_field = None
         added = len(augmented_samples)
         
         logger.info(f"Added {added} augmented samples")
@@ -350,41 +407,64 @@ class FieldExtractionDataset:
         
         return augmented
     
+    def _field_index(self) -> Dict[str, List[TrainingSample]]:
+        """Group samples by field name in a single pass, caching the result."""
+        if self._by_field is None:
+            self._by_field = defaultdict(list)
+            for sample in self._samples:
+                self._by_field[sample.field_name].append(sample)
+        return self._by_field
+    
     def get_field_samples(self, field_name: str) -> List[TrainingSample]:
         """Get all samples for a specific field."""
-        return [s for s in self.samples if s.field_name == field_name]
+        return list(self._field_index().get(field_name, []))
     
     def get_unique_fields(self) -> List[str]:
         """Get list of unique field names in the dataset."""
-        return list(set(s.field_name for s in self.samples))
+        return list(self._field_index())
     
     def to_dataframe(self) -> pd.DataFrame:
         """Convert samples to pandas DataFrame."""
-        return pd.DataFrame([
-            {
-                'text_context': s.text_context,
-                'field_name': s.field_name,
-                'field_value': s.field_value,
-                'source': s.source,
-                'confidence': s.confidence,
-            }
-            for s in self.samples
-        ])
+        # Build columns directly rather than one dict per row; the
+        # low-cardinality label columns are stored as categoricals.
+        samples = self._samples
+        return pd.DataFrame({
+            'text_context': [s.text_context for s in samples],
+            'field_name': pd.Categorical([s.field_name for s in samples]),
+            'field_value': [s.field_value for s in samples],
+            'source': pd.Categorical([s.source for s in samples]),
+            'confidence': np.fromiter(
+                (s.confidence for s in samples), dtype=np.float64, count=len(samples)
+            ),
+        })
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get dataset statistics."""
         df = self.to_dataframe()
         
         return {
-            'total_samples': len(self.samples),
-            'synthetic_samples': len([s for s in self.samples if 'synthetic' in s.source]),
-            'hitl_samples': len([s for s in self.samples if s.source == 'hitl']),
+            'total_samples': len(self._samples),
+            'synthetic_samples': len([s for s in self._samples if 'synthetic' in s.source]),
+            'hitl_samples': len([s for s in self._samples if s.source == 'hitl']),
             'unique_fields': self.get_unique_fields(),
-            'samples_per_field': df.groupby('field_name').size().to_dict(),
+            'samples_per_field': df.groupby('field_name', observed=True).size().to_dict(),
             'avg_context_length': df['text_context'].str.len().mean(),
         }
 
 
+def _create_vectorizer(config: RetrainingConfig) -> TfidfVectorizer:
+    """Create an unfitted TF-IDF vectorizer for the given configuration."""
+    return TfidfVectorizer(
+        max_features=config.max_features,
+        ngram_range=config.ngram_range,
+        lowercase=True,
+        strip_accents='unicode',
+        # Tree classifiers cast inputs to float32 anyway; emitting it
+        # directly halves the matrix and skips that conversion copy.
+        dtype=np.float32,
+    )
+
+
 class FieldExtractionModel:
     """
     ML model for field value extraction from document text.
@@ -393,16 +473,28 @@ class FieldExtractionModel:
     from OCR output and document context.
     """
     
-    def __init__(self, field_name: str, config: RetrainingConfig):
+    def __init__(
+        self,
+        field_name: str,
+        config: RetrainingConfig,
+        vectorizer: Optional[TfidfVectorizer] = None,
+        n_jobs: Optional[int] = None,
+    ):
         """
         Initialize the field extraction model.
         
         Args:
             field_name: Name of the field this model extracts.
             config: Training configuration.
+            vectorizer: Optional already-fitted vectorizer shared with other
+                field models; train() then only transforms with it.
+            n_jobs: Optional classifier parallelism overriding config.n_jobs
+                for this fit only; the saved config keeps the original value.
         """
         self.field_name = field_name
         self.config = config
+        self.n_jobs = config.n_jobs if n_jobs is None else n_jobs
+        self.shared_vectorizer = vectorizer
         self.vectorizer: Optional[TfidfVectorizer] = None
         self.classifier: Optional[Any] = None
         self.label_encoder: Optional[LabelEncoder] = None
@@ -417,7 +509,7 @@ class FieldExtractionModel:
                 max_depth=self.config.max_depth,
                 min_samples_split=self.config.min_samples_split,
                 random_state=self.config.random_state,
-                n_jobs=-1,
+                n_jobs=self.n_jobs,
             )
         elif self.config.model_type == 'gradient_boosting':
             return GradientBoostingClassifier(
@@ -425,6 +517,13 @@ class FieldExtractionModel:
                 max_depth=self.config.max_depth or 3,
                 random_state=self.config.random_state,
             )
+        elif self.config.model_type == 'hist_gradient_boosting':
+            # Bins features into uint8 histograms once; fast on small data
+            return HistGradientBoostingClassifier(
+                max_iter=self.config.n_estimators,
+                max_depth=self.config.max_depth,
+                random_state=self.config.random_state,
+            )
         elif self.config.model_type == 'logistic_regression':
             return LogisticRegression(
                 max_iter=1000,
@@ -434,6 +533,12 @@ class FieldExtractionModel:
         else:
             raise ValueError(f"Unknown model type: {self.config.model_type}")
     
+    def _model_input(self, X_vec):
+        """Densify TF-IDF features for classifiers that reject sparse input."""
+        if self.config.model_type in DENSE_MODEL_TYPES:
+            return X_vec.toarray()
+        return X_vec
+    
     def train(
         self,
         X_train: List[str],
@@ -458,19 +563,17 @@ class FieldExtractionModel:
         
         logger.info(f"Training model for field '{self.field_name}' with {len(X_train)} samples")
         
-        # Initialize vectorizer
-        self.vectorizer = TfidfVectorizer(
-            max_features=self.config.max_features,
-            ngram_range=self.config.ngram_range,
-            lowercase=True,
-            strip_accents='unicode',
-        )
-        
         # Initialize label encoder
         self.label_encoder = LabelEncoder()
         
-        # Transform text to features
-        X_train_vec = self.vectorizer.fit_transform(X_train)
+        # Transform text to features, reusing a shared vocabulary if given
+        if self.shared_vectorizer is not None:
+            self.vectorizer = self.shared_vectorizer
+            X_train_vec = self.vectorizer.transform(X_train)
+        else:
+            self.vectorizer = _create_vectorizer(self.config)
+            X_train_vec = self.vectorizer.fit_transform(X_train)
+        X_train_vec = self._model_input(X_train_vec)
         self.feature_names = self.vectorizer.get_feature_names_out().tolist()
         
         # Encode labels
@@ -481,19 +584,17 @@ class FieldExtractionModel:
         self.classifier.fit(X_train_vec, y_train_enc)
         
         training_time = time.time() - start_time
+        self.is_trained = True
         
         # Evaluate on validation set if provided
         if X_val is not None and y_val is not None:
-            metrics = self.evaluate(X_val, y_val)
-            metrics.training_time_seconds = training_time
+            metrics = replace(self.evaluate(X_val, y_val), training_time_seconds=training_time)
         else:
             # Evaluate on training set
             y_pred = self.classifier.predict(X_train_vec)
             y_pred_labels = self.label_encoder.inverse_transform(y_pred)
             metrics = self._calculate_metrics(y_train, y_pred_labels, training_time)
         
-        self.is_trained = True
-        
         logger.info(
             f"Model trained for '{self.field_name}': "
             f"accuracy={metrics.accuracy:.4f}, f1={metrics.f1_score:.4f}"
@@ -515,7 +616,7 @@ class FieldExtractionModel:
         if not self.is_trained:
             raise RuntimeError("Model not trained. Call train() first.")
         
-        X_test_vec = self.vectorizer.transform(X_test)
+        X_test_vec = self._model_input(self.vectorizer.transform(X_test))
         y_pred_enc = self.classifier.predict(X_test_vec)
         y_pred = self.label_encoder.inverse_transform(y_pred_enc)
         
@@ -534,19 +635,21 @@ class FieldExtractionModel:
         if not self.is_trained:
             raise RuntimeError("Model not trained. Call train() first.")
         
-        X_vec = self.vectorizer.transform([text_context])
-        
-        # Get prediction
-        y_pred_enc = self.classifier.predict(X_vec)
-        y_pred = self.label_encoder.inverse_transform(y_pred_enc)[0]
+        X_vec = self._model_input(self.vectorizer.transform([text_context]))
         
-        # Get confidence (probability)
+        # Derive label and confidence from a single probability pass;
+        # predict() would recompute the same probabilities internally.
         if hasattr(self.classifier, 'predict_proba'):
             proba = self.classifier.predict_proba(X_vec)[0]
-            confidence = float(np.max(proba))
+            best = int(np.argmax(proba))
+            y_pred_enc = self.classifier.classes_[best:best + 1]
+            confidence = float(proba[best])
         else:
+            y_pred_enc = self.classifier.predict(X_vec)
             confidence = 1.0
         
+        y_pred = self.label_encoder.inverse_transform(y_pred_enc)[0]
+        
         return y_pred, confidence
     
     def _calculate_metrics(
@@ -599,20 +702,30 @@ class FieldExtractionModel:
         
         return {}
     
-    def save(self, path: str) -> None:
-        """Save the model to disk."""
+    def save(self, path: str, vectorizer_file: Optional[str] = None) -> None:
+        """
+        Save the model to disk.
+        
+        Args:
+            path: Destination file for the model.
+            vectorizer_file: Optional file name, relative to the model's
+                directory, where the vectorizer is already saved; the model
+                then stores only this reference instead of its own copy.
+        """
         os.makedirs(os.path.dirname(path), exist_ok=True)
         
         model_data = {
             'field_name': self.field_name,
-            'vectorizer': self.vectorizer,
+            'vectorizer': None if vectorizer_file else self.vectorizer,
+            'vectorizer_file': vectorizer_file,
             'classifier': self.classifier,
             'label_encoder': self.label_encoder,
             'feature_names': self.feature_names,
             'config': asdict(self.config),
         }
         
-        joblib.dump(model_data, path)
+        # zlib level 3 shrinks the sparse vocab/tree arrays at little CPU cost
+        joblib.dump(model_data, path, compress=3, protocol=pickle.HIGHEST_PROTOCOL)
         logger.info(f"Model saved to {path}")
     
     @classmethod
@@ -623,7 +736,13 @@ class FieldExtractionModel:
         config = RetrainingConfig(**model_data['config'])
         model = cls(field_name=model_data['field_name'], config=config)
         
-        model.vectorizer = model_data['vectorizer']
+        vectorizer_file = model_data.get('vectorizer_file')
+        if vectorizer_file:
+            model.vectorizer = joblib.load(
+                os.path.join(os.path.dirname(path), vectorizer_file)
+            )
+        else:
+            model.vectorizer = model_data['vectorizer']
         model.classifier = model_data['classifier']
         model.label_encoder = model_data['label_encoder']
         model.feature_names = model_data['feature_names']
@@ -644,6 +763,7 @@ class RetrainingResult:
     training_time_seconds: float
     output_dir: str
     errors: List[str] = field(default_factory=list)
+    vectorizer_path: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -656,9 +776,149 @@ class RetrainingResult:
             'training_time_seconds': self.training_time_seconds,
             'output_dir': self.output_dir,
             'errors': self.errors,
+            'vectorizer_path': self.vectorizer_path,
         }
 
 
+def _split_field_samples(
+    field_samples: List[TrainingSample],
+    config: RetrainingConfig,
+) -> Tuple[List[str], List[str], List[str], List[str], List[str], List[str]]:
+    """
+    Split a field's samples into train, validation and test sets.
+    
+    Returns:
+        Tuple of (X_train, X_val, X_test, y_train, y_val, y_test).
+    """
+    # Prepare data
+    X = [s.text_context for s in field_samples]
+    y = [s.field_value for s in field_samples]
+    
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y,
+        test_size=config.test_size,
+        random_state=config.random_state,
+        stratify=None,  # Avoid stratify issues with small classes
+    )
+    
+    # Further split for validation
+    X_train, X_val, y_train, y_val = train_test_split(
+        X_train, y_train,
+        test_size=config.validation_size,
+        random_state=config.random_state,
+    )
+    
+    return X_train, X_val, X_test, y_train, y_val, y_test
+
+
+def _fit_field(
+    field_name: str,
+    field_samples: List[TrainingSample],
+    config: RetrainingConfig,
+    output_dir: str,
+    vectorizer: Optional[TfidfVectorizer] = None,
+    splits: Optional[Tuple[List[str], ...]] = None,
+    n_jobs: Optional[int] = None,
+) -> Tuple[Optional[ModelArtifact], Optional[str]]:
+    """
+    Train, evaluate and save the model for a single field.
+    
+    Runs inside a joblib worker, so failures are returned rather than raised
+    to keep one bad field from aborting the others.
+    
+    Args:
+        splits: Optional precomputed result of _split_field_samples; required
+            alongside a shared vectorizer so its fit saw no held-out text.
+        n_jobs: Optional classifier parallelism overriding config.n_jobs.
+    
+    Returns:
+        Tuple of (artifact, error message); the artifact is None when the
+        field was skipped or failed.
+    """
+    logger.info(f"\n{'='*40}")
+    logger.info(f"Training model for field: {field_name}")
+    logger.info(f"{'='*40}")
+    
+    try:
+        if len(field_samples) < config.min_samples_per_field:
+            logger.warning(
+                f"Skipping field '{field_name}': only {len(field_samples)} samples "
+                f"(minimum: {config.min_samples_per_field})"
+            )
+            return None, None
+        
+        if splits is None:
+            splits = _split_field_samples(field_samples, config)
+        X_train, X_val, X_test, y_train, y_val, y_test = splits
+        
+        logger.info(
+            f"Data split: train={len(X_train)}, val={len(X_val)}, test={len(X_test)}"
+        )
+        
+        # Create and train model
+        model = FieldExtractionModel(
+            field_name=field_name, config=config, vectorizer=vectorizer, n_jobs=n_jobs
+        )
+        metrics = model.train(X_train, y_train, X_val, y_val)
+        
+        # Evaluate on test set
+        test_metrics = model.evaluate(X_test, y_test)
+        logger.info(
+            f"Test metrics: accuracy={test_metrics.accuracy:.4f}, "
+            f"f1={test_metrics.f1_score:.4f}"
+        )
+        
+        # Save model
+        model_version = datetime.now().strftime("%Y%m%d_%H%M%S")
+        model_id = hashlib.md5(
+            f"{field_name}_{model_version}".encode()
+        ).hexdigest()[:8]
+        
+        model_path = os.path.join(output_dir, f"{field_name}_model.joblib")
+        model.save(
+            model_path,
+            vectorizer_file=SHARED_VECTORIZER_FILENAME if vectorizer is not None else None,
+        )
+        
+        # Save feature importance
+        if config.save_feature_importance:
+            importance = model.get_feature_importance()
+            if importance:
+                importance_path = os.path.join(
+                    output_dir, f"{field_name}_feature_importance.json"
+                )
+                with open(importance_path, 'w') as f:
+                    json.dump(importance, f, indent=2)
+        
+        # Create artifact metadata
+        artifact = ModelArtifact(
+            model_id=model_id,
+            model_version=model_version,
+            model_type=config.model_type,
+            field_name=field_name,
+            created_at=datetime.now().isoformat(),
+            training_samples=len(X_train),
+            synthetic_samples=len([
+                s for s in field_samples if 'synthetic' in s.source
+            ]),
+            hitl_samples=len([
+                s for s in field_samples if s.source == 'hitl'
+            ]),
+            metrics=test_metrics,
+            artifact_path=model_path,
+            config=asdict(config),
+        )
+        
+        logger.info(f"Model artifact created: {model_id}")
+        return artifact, None
+        
+    except Exception as e:
+        error_msg = f"Failed to train model for field '{field_name}': {e}"
+        logger.error(error_msg, exc_info=True)
+        return None, error_msg
+
+
 def retrain_parser_model(
     synthetic_data_path: Optional[str] = None,
     hitl_data_path: Optional[str] = None,
@@ -742,12 +1002,16 @@ def retrain_parser_model(
         stats = dataset.get_statistics()
         logger.info(f"Dataset statistics: {json.dumps(stats, indent=2)}")
         
-        # Save training data if configured
+        # Save training data if configured, on a background thread so the
+        # dump overlaps with model training; joined before the manifest.
+        training_data_write = None
         if config.save_training_data:
             data_path = os.path.join(output_dir, "training_data.json")
-            with open(data_path, 'w') as f:
-                json.dump([asdict(s) for s in dataset.samples], f, indent=2)
-            logger.info(f"Training data saved to {data_path}")
+            io_executor = ThreadPoolExecutor(max_workers=1)
+            training_data_write = io_executor.submit(
+                _write_json, data_path, [asdict(s) for s in dataset.samples]
+            )
+            io_executor.shutdown(wait=False)
         
         # Determine fields to train
         if fields_to_train is None:
@@ -755,103 +1019,79 @@ def retrain_parser_model(
         
         logger.info(f"Training models for fields: {fields_to_train}")
         
-        # Train model for each field
-        for field_name in fields_to_train:
-            logger.info(f"\n{'='*40}")
-            logger.info(f"Training model for field: {field_name}")
-            logger.info(f"{'='*40}")
-            
-            try:
-                # Get samples for this field
-                field_samples = dataset.get_field_samples(field_name)
-                
-                if len(field_samples) < config.min_samples_per_field:
-                    logger.warning(
-                        f"Skipping field '{field_name}': only {len(field_samples)} samples "
-                        f"(minimum: {config.min_samples_per_field})"
-                    )
-                    continue
-                
-                # Prepare data
-                X = [s.text_context for s in field_samples]
-                y = [s.field_value for s in field_samples]
-                
-                # Split data
-                X_train, X_test, y_train, y_test = train_test_split(
-                    X, y,
-                    test_size=config.test_size,
-                    random_state=config.random_state,
-                    stratify=None,  # Avoid stratify issues with small classes
-                )
-                
-                # Further split for validation
-                X_train, X_val, y_train, y_val = train_test_split(
-                    X_train, y_train,
-                    test_size=config.validation_size,
-                    random_state=config.random_state,
-                )
-                
-                logger.info(
-                    f"Data split: train={len(X_train)}, val={len(X_val)}, test={len(X_test)}"
-                )
-                
-                # Create and train model
-                model = FieldExtractionModel(field_name=field_name, config=config)
-                metrics = model.train(X_train, y_train, X_val, y_val)
-                
-                # Evaluate on test set
-                test_metrics = model.evaluate(X_test, y_test)
-                logger.info(
-                    f"Test metrics: accuracy={test_metrics.accuracy:.4f}, "
-                    f"f1={test_metrics.f1_score:.4f}"
-                )
-                
-                # Save model
-                model_version = datetime.now().strftime("%Y%m%d_%H%M%S")
-                model_id = hashlib.md5(
-                    f"{field_name}_{model_version}".encode()
-                ).hexdigest()[:8]
-                
-                model_path = os.path.join(output_dir, f"{field_name}_model.joblib")
-                model.save(model_path)
-                
-                # Save feature importance
-                if config.save_feature_importance:
-                    importance = model.get_feature_importance()
-                    if importance:
-                        importance_path = os.path.join(
-                            output_dir, f"{field_name}_feature_importance.json"
-                        )
-                        with open(importance_path, 'w') as f:
-                            json.dump(importance, f, indent=2)
-                
-                # Create artifact metadata
-                artifact = ModelArtifact(
-                    model_id=model_id,
-                    model_version=model_version,
-                    model_type=config.model_type,
-                    field_name=field_name,
-                    created_at=datetime.now().isoformat(),
-                    training_samples=len(X_train),
-                    synthetic_samples=len([
-                        s for s in field_samples if 'synthetic' in s.source
-                    ]),
-                    hitl_samples=len([
-                        s for s in field_samples if s.source == 'hitl'
-                    ]),
-                    metrics=test_metrics,
-                    artifact_path=model_path,
-                    config=asdict(config),
-                )
+        # Train model for each field. Fits are independent, so they run in
+        # parallel; tiny datasets stay on threads to avoid process start-up.
+        field_samples_by_name = {
+            field_name: dataset.get_field_samples(field_name)
+            for field_name in fields_to_train
+        }
+        sample_count = sum(len(s) for s in field_samples_by_name.values())
+        backend = 'loky' if sample_count >= PROCESS_BACKEND_MIN_SAMPLES else 'threading'
+        
+        # With several fields already fitting concurrently, keep each
+        # classifier single-threaded so the two levels don't oversubscribe.
+        # The override applies to the estimator only, so saved configs and
+        # artifact metadata still report the settings the caller ran with.
+        classifier_n_jobs = None
+        if len(field_samples_by_name) > 1 and config.n_jobs != 1:
+            classifier_n_jobs = 1
+        
+        # Split every trainable field up front so the shared vectorizer can
+        # be fitted on training text only.
+        splits_by_name = {
+            field_name: _split_field_samples(field_samples, config)
+            for field_name, field_samples in field_samples_by_name.items()
+            if len(field_samples) >= config.min_samples_per_field
+        }
+        
+        # Every field is classified from the same document contexts, so
+        # build the TF-IDF vocabulary once instead of once per field. A
+        # document's context is shared across fields, so text held out for
+        # any field is left out of the fit to keep every field's metrics clean.
+        held_out = {
+            text
+            for X_train, X_val, X_test, *_ in splits_by_name.values()
+            for text in X_val + X_test
+        }
+        shared_vectorizer = _create_vectorizer(config)
+        try:
+            shared_vectorizer.fit([
+                text
+                for X_train, *_ in splits_by_name.values()
+                for text in X_train
+                if text not in held_out
+            ])
+        except ValueError as e:
+            # e.g. empty vocabulary; let each field fit (and report) its own
+            logger.warning(f"Shared vectorizer fit failed, fitting per field: {e}")
+            shared_vectorizer = None
+        
+        # Persist the shared vectorizer once; field models only reference it
+        if shared_vectorizer is not None:
+            result.vectorizer_path = os.path.join(output_dir, SHARED_VECTORIZER_FILENAME)
+            joblib.dump(
+                shared_vectorizer, result.vectorizer_path,
+                compress=3, protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        
+        outcomes = Parallel(n_jobs=config.n_jobs, backend=backend)(
+            delayed(_fit_field)(
+                field_name, field_samples, config, output_dir,
+                shared_vectorizer, splits_by_name.get(field_name), classifier_n_jobs,
+            )
+            for field_name, field_samples in field_samples_by_name.items()
+        )
+        
+        for artifact, error_msg in outcomes:
+            if artifact is not None:
                 result.model_artifacts.append(artifact)
-                
-                logger.info(f"Model artifact created: {model_id}")
-                
-            except Exception as e:
-                error_msg = f"Failed to train model for field '{field_name}': {e}"
-                logger.error(error_msg, exc_info=True)
+            if error_msg is not None:
                 result.errors.append(error_msg)
         
+        if training_data_write is not None:
+            training_data_write.result()
+            logger.info(f"Training data saved to {data_path}")
+        
         # Save manifest
         manifest_path = os.path.join(output_dir, "manifest.json")
         with open(manifest_path, 'w') as f:
@@ -891,37 +1131,46 @@ def generate_synthetic_training_data(
     Returns:
         Path to the generated file.
     """
-    import random
     from faker import Faker
     
+    # Instance-local seeds keep output deterministic even when several
+    # generators run concurrently.
     fake = Faker()
-    random.seed(42)
-    Faker.seed(42)
+    fake.seed_instance(42)
+    rng = np.random.default_rng(42)
     
-    samples = []
+    # Draw every numeric field in one vectorized call per column
+    totals = rng.uniform(50, 5000, num_samples).tolist()
+    invoice_numbers = rng.integers(10000, 100000, num_samples).tolist()
+    subtotals = rng.uniform(40, 4500, num_samples).tolist()
+    taxes = rng.uniform(0, 500, num_samples).tolist()
     
-    for i in range(num_samples):
-        # Generate realistic field values
-        total_amount = f"${random.uniform(50, 5000):.2f}"
-        invoice_number = f"INV-{random.randint(10000, 99999)}"
-        patient_name = fake.name()
-        bill_date = fake.date_this_year().strftime("%m/%d/%Y")
-        
-        sample = {
+    # Bill dates fall between Jan 1 and today, like fake.date_this_year()
+    today = np.datetime64(datetime.now().date(), 'D')
+    year_start = today.astype('datetime64[Y]').astype('datetime64[D]')
+    days_elapsed = int((today - year_start).astype(int))
+    bill_dates = (
+        year_start + rng.integers(0, days_elapsed + 1, num_samples)
+    ).astype(object)
+    
+    samples = [
+        {
             "document_id": f"doc_{i:05d}",
-            "total_amount": total_amount,
-            "invoice_number": invoice_number,
-            "patient_name": patient_name,
-            "bill_date": bill_date,
+            "total_amount": f"${total:.2f}",
+            "invoice_number": f"INV-{invoice_number}",
+            "patient_name": fake.name(),
+            "bill_date": bill_date.strftime("%m/%d/%Y"),
             "provider_name": f"{fake.city()} Medical Center",
-            "subtotal": f"${random.uniform(40, 4500):.2f}",
-            "tax": f"${random.uniform(0, 500):.2f}",
+            "subtotal": f"${subtotal:.2f}",
+            "tax": f"${tax:.2f}",
         }
-        samples.append(sample)
+        for i, (total, invoice_number, subtotal, tax, bill_date) in enumerate(
+            zip(totals, invoice_numbers, subtotals, taxes, bill_dates)
+        )
+    ]
     
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w') as f:
-        json.dump(samples, f, indent=2)
+    _write_json(output_path, samples)
     
     logger.info(f"Generated {num_samples} synthetic samples at {output_path}")
     return output_path
@@ -945,28 +1194,28 @@ def generate_hitl_training_data(
     from faker import Faker
     
     fake = Faker()
-    random.seed(123)
-    Faker.seed(123)
+    fake.seed_instance(123)
+    rng = random.Random(123)
     
     corrections = []
     
     field_types = ['total_amount', 'invoice_number', 'patient_name', 'bill_date']
     
     for i in range(num_samples):
-        field_name = random.choice(field_types)
+        field_name = rng.choice(field_types)
         
         # Simulate OCR errors and corrections
         if field_name == 'total_amount':
-            correct_value = f"${random.uniform(50, 5000):.2f}"
+            correct_value = f"${rng.uniform(50, 5000):.2f}"
             # Simulate OCR error
             extracted_value = correct_value.replace('$', 'S').replace('.', ',')
         elif field_name == 'invoice_number':
-            correct_value = f"INV-{random.randint(10000, 99999)}"
+            correct_value = f"INV-{rng.randint(10000, 99999)}"
             extracted_value = correct_value.replace('I', '1').replace('V', 'U')
         elif field_name == 'patient_name':
             correct_value = fake.name()
             # Simulate typo
-            extracted_value = correct_value[:-1] + random.choice('abcde')
+            extracted_value = correct_value[:-1] + rng.choice('abcde')
         else:
             correct_value = fake.date_this_year().strftime("%m/%d/%Y")
             extracted_value = correct_value.replace('/', '-')
@@ -976,13 +1225,12 @@ def generate_hitl_training_data(
             "field_name": field_name,
             "extracted_value": extracted_value,
             "correct_value": correct_value,
-            "original_confidence": random.uniform(0.3, 0.7),
+            "original_confidence": rng.uniform(0.3, 0.7),
         }
         corrections.append(correction)
     
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w') as f:
-        json.dump(corrections, f, indent=2)
+    _write_json(output_path, corrections)
     
     logger.info(f"Generated {num_samples} HITL corrections at {output_path}")
     return output_path
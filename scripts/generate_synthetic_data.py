@@ -16,6 +16,7 @@ import os
 import random
 import string
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -40,8 +41,13 @@ from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize Faker with seed for reproducibility
+# Shared generators, built once per process and reseeded via _reseed()
 fake = Faker()
+rng = random.Random()
+
+# Below this many samples generate_dataset renders in-process by default;
+# starting worker processes costs more than a handful of PDFs.
+PARALLEL_MIN_SAMPLES = 20
 
 
 @dataclass
@@ -105,6 +111,9 @@ MEDICAL_PROCEDURES = [
     ("Allergy Testing", "95004", 100.00, 300.00),
 ]
 
+# Deletes the '$' and ',' from formatted amounts like "$1,234.56"
+CURRENCY_STRIP = str.maketrans('', '', '$,')
+
 # Healthcare provider templates
 PROVIDER_TYPES = [
     "Medical Center",
@@ -118,33 +127,42 @@ PROVIDER_TYPES = [
 ]
 
 
+INVOICE_NUMBER_FORMATS = (
+    lambda: f"INV-{datetime.now().year}-{rng.randint(10000, 99999)}",
+    lambda: f"BILL-{rng.randint(100000, 999999)}",
+    lambda: f"{fake.random_uppercase_letter()}{fake.random_uppercase_letter()}-{rng.randint(1000, 9999)}-{rng.randint(100, 999)}",
+    lambda: f"MED{datetime.now().strftime('%Y%m')}{rng.randint(1000, 9999)}",
+    lambda: f"HC-{rng.randint(10000000, 99999999)}",
+)
+
+ACCOUNT_NUMBER_FORMATS = (
+    lambda: f"ACC-{rng.randint(100000, 999999)}",
+    lambda: f"{rng.randint(1000000000, 9999999999)}",
+    lambda: f"PT{rng.randint(10000, 99999)}{fake.random_uppercase_letter()}",
+)
+
+
+def _reseed(seed: int) -> None:
+    """Reseed the shared Faker and Random instances."""
+    fake.seed_instance(seed)
+    rng.seed(seed)
+
+
 def generate_invoice_number() -> str:
     """Generate a realistic invoice number."""
-    formats = [
-        lambda: f"INV-{datetime.now().year}-{random.randint(10000, 99999)}",
-        lambda: f"BILL-{random.randint(100000, 999999)}",
-        lambda: f"{fake.random_uppercase_letter()}{fake.random_uppercase_letter()}-{random.randint(1000, 9999)}-{random.randint(100, 999)}",
-        lambda: f"MED{datetime.now().strftime('%Y%m')}{random.randint(1000, 9999)}",
-        lambda: f"HC-{random.randint(10000000, 99999999)}",
-    ]
-    return random.choice(formats)()
+    return rng.choice(INVOICE_NUMBER_FORMATS)()
 
 
 def generate_account_number() -> str:
     """Generate a realistic account number."""
-    formats = [
-        lambda: f"ACC-{random.randint(100000, 999999)}",
-        lambda: f"{random.randint(1000000000, 9999999999)}",
-        lambda: f"PT{random.randint(10000, 99999)}{fake.random_uppercase_letter()}",
-    ]
-    return random.choice(formats)()
+    return rng.choice(ACCOUNT_NUMBER_FORMATS)()
 
 
 def generate_provider_info() -> Tuple[str, str, str, str, str]:
     """Generate realistic provider information."""
     city = fake.city()
     state = fake.state_abbr()
-    provider_name = f"{city} {random.choice(PROVIDER_TYPES)}"
+    provider_name = f"{city} {rng.choice(PROVIDER_TYPES)}"
     address = fake.street_address()
     zip_code = fake.zipcode()
     phone = fake.phone_number()
@@ -155,14 +173,14 @@ def generate_provider_info() -> Tuple[str, str, str, str, str]:
 def generate_line_items(num_items: int = None) -> List[LineItem]:
     """Generate realistic line items for a medical bill."""
     if num_items is None:
-        num_items = random.randint(1, 8)
+        num_items = rng.randint(1, 8)
     
     items = []
-    selected_procedures = random.sample(MEDICAL_PROCEDURES, min(num_items, len(MEDICAL_PROCEDURES)))
+    selected_procedures = rng.sample(MEDICAL_PROCEDURES, min(num_items, len(MEDICAL_PROCEDURES)))
     
     for desc, cpt, min_price, max_price in selected_procedures:
-        quantity = random.choices([1, 2, 3], weights=[0.7, 0.2, 0.1])[0]
-        unit_price = round(random.uniform(min_price, max_price), 2)
+        quantity = rng.choices([1, 2, 3], weights=[0.7, 0.2, 0.1])[0]
+        unit_price = round(rng.uniform(min_price, max_price), 2)
         line_total = round(quantity * unit_price, 2)
         
         items.append(LineItem(
@@ -178,7 +196,7 @@ def generate_line_items(num_items: int = None) -> List[LineItem]:
 
 def generate_bill_date() -> str:
     """Generate a realistic bill date within the past year."""
-    days_ago = random.randint(1, 365)
+    days_ago = rng.randint(1, 365)
     bill_date = datetime.now() - timedelta(days=days_ago)
     
     # Various date formats
@@ -188,7 +206,7 @@ def generate_bill_date() -> str:
         "%B %d, %Y",
         "%d-%m-%Y",
     ]
-    return bill_date.strftime(random.choice(formats))
+    return bill_date.strftime(rng.choice(formats))
 
 
 def create_pdf_bill(
@@ -320,10 +338,6 @@ def create_pdf_bill(
     story.append(Spacer(1, 0.2 * inch))
     
     # Totals section
-    subtotal = float(labels.subtotal.replace('$', '').replace(',', ''))
-    tax = float(labels.tax.replace('$', '').replace(',', ''))
-    total = float(labels.total_amount.replace('$', '').replace(',', ''))
-    
     totals_data = [
         ['', '', '', 'Subtotal:', labels.subtotal],
         ['', '', '', 'Tax:', labels.tax],
@@ -346,7 +360,7 @@ def create_pdf_bill(
     story.append(HRFlowable(width="100%", thickness=0.5, color=colors.HexColor('#e2e8f0')))
     story.append(Spacer(1, 0.1 * inch))
     
-    footer_text = random.choice([
+    footer_text = rng.choice([
         "Payment is due within 30 days. Please include your account number with your payment.",
         "Thank you for choosing our services. Payment due upon receipt.",
         "For billing questions, please contact our billing department.",
@@ -355,7 +369,7 @@ def create_pdf_bill(
     story.append(Paragraph(footer_text, styles['CenterAlign']))
     
     # Payment options (randomly include)
-    if random.random() > 0.5:
+    if rng.random() > 0.5:
         story.append(Spacer(1, 0.2 * inch))
         payment_info = """
         <b>Payment Options:</b><br/>
@@ -372,6 +386,7 @@ def create_pdf_bill(
 def generate_synthetic_bill(
     output_dir: str,
     document_id: str = None,
+    seed: Optional[int] = None,
 ) -> BillLabels:
     """
     Generate a single synthetic medical bill with labels.
@@ -379,6 +394,7 @@ def generate_synthetic_bill(
     Args:
         output_dir: Directory to save the PDF and JSON files.
         document_id: Optional document ID (generated if not provided).
+        seed: Optional seed; the same seed always yields the same bill.
     
     Returns:
         BillLabels containing the ground truth labels.
@@ -386,6 +402,9 @@ def generate_synthetic_bill(
     if document_id is None:
         document_id = str(uuid.uuid4())[:8]
     
+    if seed is not None:
+        _reseed(seed)
+    
     # Generate all bill components
     patient_name = fake.name()
     patient_address = f"{fake.street_address()}\n{fake.city()}, {fake.state_abbr()} {fake.zipcode()}"
@@ -400,7 +419,7 @@ def generate_synthetic_bill(
     
     # Calculate totals
     subtotal = sum(item.line_total for item in line_items)
-    tax_rate = random.choice([0, 0, 0, 0.05, 0.06, 0.075, 0.08])  # Usually no tax on medical
+    tax_rate = rng.choice([0, 0, 0, 0.05, 0.06, 0.075, 0.08])  # Usually no tax on medical
     tax = round(subtotal * tax_rate, 2)
     total_amount = round(subtotal + tax, 2)
     
@@ -438,10 +457,22 @@ def generate_synthetic_bill(
     return labels
 
 
+def _generate_sample(task: Tuple[str, str, int]) -> BillLabels:
+    """
+    Generate one bill from an (output_dir, document_id, seed) task.
+    
+    Each sample is determined by its own seed alone, whichever process
+    or order it runs in.
+    """
+    output_dir, document_id, sample_seed = task
+    return generate_synthetic_bill(output_dir, document_id, seed=sample_seed)
+
+
 def generate_dataset(
     output_dir: str,
     num_samples: int = 100,
     seed: Optional[int] = None,
+    workers: Optional[int] = None,
 ) -> List[BillLabels]:
     """
     Generate a dataset of synthetic medical bills.
@@ -449,28 +480,44 @@ def generate_dataset(
     Args:
         output_dir: Directory to save generated files.
         num_samples: Number of samples to generate.
-        seed: Random seed for reproducibility.
+        seed: Random seed for reproducibility. Sample i is generated
+            from seed + i.
+        workers: Number of worker processes for PDF rendering. Defaults
+            to all cores, or 1 below PARALLEL_MIN_SAMPLES samples.
     
     Returns:
         List of BillLabels for all generated samples.
     """
-    if seed is not None:
-        random.seed(seed)
-        Faker.seed(seed)
+    if seed is None:
+        seed = random.SystemRandom().randrange(2**32)
+    
+    if workers is None:
+        workers = (os.cpu_count() or 1) if num_samples >= PARALLEL_MIN_SAMPLES else 1
     
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
     
     logger.info(f"Generating {num_samples} synthetic bills in {output_dir}")
     
+    tasks = [
+        (output_dir, f"{i+1:05d}", seed + i)
+        for i in range(num_samples)
+    ]
+    
+    # Render PDFs across worker processes; map() keeps sample order
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    results = executor.map(_generate_sample, tasks) if executor else map(_generate_sample, tasks)
+    
     all_labels = []
-    for i in range(num_samples):
-        document_id = f"{i+1:05d}"
-        labels = generate_synthetic_bill(output_dir, document_id)
-        all_labels.append(labels)
-        
-        if (i + 1) % 10 == 0:
-            logger.info(f"Progress: {i + 1}/{num_samples} samples generated")
+    try:
+        for labels in results:
+            all_labels.append(labels)
+            
+            if len(all_labels) % 10 == 0:
+                logger.info(f"Progress: {len(all_labels)}/{num_samples} samples generated")
+    finally:
+        if executor:
+            executor.shutdown()
     
     # Save combined labels file
     combined_path = os.path.join(output_dir, "labels.json")
@@ -480,11 +527,12 @@ def generate_dataset(
     logger.info(f"Dataset generation complete. Combined labels saved to {combined_path}")
     
     # Generate summary statistics
+    total_amounts = [float(l.total_amount.translate(CURRENCY_STRIP)) for l in all_labels]
     summary = {
         "total_samples": num_samples,
         "total_amount_range": {
-            "min": min(float(l.total_amount.replace('$', '').replace(',', '')) for l in all_labels),
-            "max": max(float(l.total_amount.replace('$', '').replace(',', '')) for l in all_labels),
+            "min": min(total_amounts),
+            "max": max(total_amounts),
         },
         "avg_line_items": sum(len(l.line_items) for l in all_labels) / len(all_labels),
         "generated_at": datetime.now().isoformat(),
@@ -522,6 +570,12 @@ def main():
         default=None,
         help="Random seed for reproducibility (default: None)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for PDF rendering (default: all cores)",
+    )
     
     args = parser.parse_args()
     
@@ -529,6 +583,7 @@ def main():
         output_dir=args.output_dir,
         num_samples=args.num_samples,
         seed=args.seed,
+        workers=args.workers,
     )
 
 
@@ -0,0 +1,19 @@
+"""
+Pytest configuration for the top-level test suite.
+
+Puts the ml directory on sys.path once per interpreter so test modules
+can import the ml packages directly, and the tests directory so they can
+import shared helpers such as json_compat.
+"""
+
+import os
+import sys
+
+TESTS_DIR = os.path.abspath(os.path.dirname(__file__))
+if TESTS_DIR not in sys.path:
+    sys.path.insert(0, TESTS_DIR)
+
+# Add ml directory to path for imports
+ML_DIR = os.path.abspath(os.path.join(TESTS_DIR, "..", "ml"))
+if ML_DIR not in sys.path:
+    sys.path.insert(0, ML_DIR)
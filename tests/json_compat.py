@@ -0,0 +1,13 @@
+"""
+JSON helpers shared by the test suite.
+
+tests/conftest.py puts this directory on sys.path, so test modules can
+``from json_compat import loads``.
+"""
+
+try:
+    from orjson import loads
+except ImportError:  # orjson is optional; fall back to stdlib json
+    from json import loads
+
+__all__ = ["loads"]
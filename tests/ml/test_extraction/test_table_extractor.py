@@ -4,16 +4,29 @@ Unit tests for table extraction utilities.
 Tests the extract_tables_from_pdf function with mocked PDF libraries.
 """
 
+import importlib.util
 import pytest
-import pandas as pd
 from pathlib import Path
-from unittest.mock import patch, MagicMock, mock_open
-import tempfile
+from unittest.mock import MagicMock
 import os
 import sys
+import types
 
-# Add ml directory to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "ml"))
+# table_extractor imports pandas at module level, so importing it lazily in
+# individual tests would not save anything. Skip the module cleanly instead
+# when pandas is unavailable (e.g. in a CI shard without the ML stack).
+pd = pytest.importorskip("pandas")
+
+# Resolved once at import so the integration test's skip is decided up front.
+HAS_REPORTLAB = importlib.util.find_spec("reportlab") is not None
+
+# Table rendered into the integration test PDF
+SAMPLE_PDF_TABLE_DATA = [
+    ["CPT Code", "Description", "Amount"],
+    ["99213", "Office Visit", "$150.00"],
+    ["85025", "CBC", "$45.00"],
+    ["80053", "Metabolic Panel", "$89.00"],
+]
 
 from extraction.table_extractor import (
     extract_tables_from_pdf,
@@ -25,6 +38,36 @@ from extraction.table_extractor import (
 )
 
 
+class FakePage:
+    """Minimal stand-in for a pdfplumber page."""
+
+    __slots__ = ("_tables",)
+
+    def __init__(self, tables: list):
+        self._tables = tables
+
+    def extract_tables(self) -> list:
+        return self._tables
+
+
+class FakePdf:
+    """Minimal stand-in for a pdfplumber PDF context manager."""
+
+    def __init__(self, pages: list[FakePage]):
+        self.pages = pages
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def make_fake_pdf(pages_data: list[list]) -> FakePdf:
+    """Build a FakePdf with one FakePage per entry of extracted tables."""
+    return FakePdf([FakePage(tables) for tables in pages_data])
+
+
 @pytest.fixture
 def sample_dataframe() -> pd.DataFrame:
     """Create a sample medical bill table DataFrame."""
@@ -37,12 +80,45 @@ def sample_dataframe() -> pd.DataFrame:
 
 
 @pytest.fixture
-def sample_pdf_path(tmp_path) -> str:
-    """Create a temporary PDF file path."""
-    pdf_path = tmp_path / "sample_bill.pdf"
-    # Create an empty file to pass existence check
-    pdf_path.write_bytes(b"%PDF-1.4 fake pdf")
-    return str(pdf_path)
+def sample_pdf_path(monkeypatch) -> str:
+    """
+    Provide a PDF path that passes the extractor's existence check.
+
+    The PDF libraries are faked in these tests, so nothing is written to
+    disk; Path.exists is patched to report the fake path as present.
+    """
+    fake_path = "/fake/sample_bill.pdf"
+    real_exists = Path.exists
+
+    def exists(self, *args, **kwargs) -> bool:
+        if str(self) == fake_path:
+            return True
+        return real_exists(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "exists", exists)
+    return fake_path
+
+
+@pytest.fixture
+def fake_camelot(monkeypatch) -> types.SimpleNamespace:
+    """
+    Install a fake camelot module for the duration of a test.
+
+    table_extractor imports camelot lazily inside the extraction function,
+    so the fake is registered in sys.modules rather than patched onto the
+    extractor module. Tests configure ``fake_camelot.read_pdf`` directly.
+    """
+    fake = types.SimpleNamespace(read_pdf=MagicMock())
+    monkeypatch.setitem(sys.modules, "camelot", fake)
+    return fake
+
+
+@pytest.fixture
+def fake_pdfplumber(monkeypatch) -> types.SimpleNamespace:
+    """Install a fake pdfplumber module; tests configure ``open``."""
+    fake = types.SimpleNamespace(open=MagicMock())
+    monkeypatch.setitem(sys.modules, "pdfplumber", fake)
+    return fake
 
 
 @pytest.fixture
@@ -81,22 +157,29 @@ class TestExtractTablesFromPdf:
     def test_uses_camelot_first(
         self,
         sample_pdf_path: str,
+        fake_camelot,
         mock_camelot_tables,
         sample_dataframe: pd.DataFrame,
     ):
         """Test that Camelot is used as primary extractor."""
-        with patch("extraction.table_extractor.camelot") as mock_camelot:
-            mock_camelot.read_pdf.return_value = mock_camelot_tables
+        fake_camelot.read_pdf.return_value = mock_camelot_tables
 
-            tables = extract_tables_from_pdf(sample_pdf_path)
+        tables = extract_tables_from_pdf(sample_pdf_path)
 
-            mock_camelot.read_pdf.assert_called()
-            assert len(tables) == 1
-            assert tables[0].equals(sample_dataframe)
+        fake_camelot.read_pdf.assert_called()
+        assert len(tables) == 1
+        pd.testing.assert_frame_equal(
+            tables[0],
+            sample_dataframe,
+            check_exact=True,
+            check_flags=False,
+        )
 
     def test_falls_back_to_pdfplumber(
         self,
         sample_pdf_path: str,
+        fake_camelot,
+        fake_pdfplumber,
         sample_dataframe: pd.DataFrame,
     ):
         """Test fallback to pdfplumber when Camelot finds no tables."""
@@ -104,77 +187,62 @@ class TestExtractTablesFromPdf:
         empty_table_list.__len__ = MagicMock(return_value=0)
         empty_table_list.__iter__ = MagicMock(return_value=iter([]))
 
-        with patch("extraction.table_extractor.camelot") as mock_camelot, \
-             patch("extraction.table_extractor.pdfplumber") as mock_pdfplumber:
-
-            mock_camelot.read_pdf.return_value = empty_table_list
+        fake_camelot.read_pdf.return_value = empty_table_list
 
-            # Setup pdfplumber mock
-            mock_page = MagicMock()
-            mock_page.extract_tables.return_value = [
+        fake_pdfplumber.open.return_value = make_fake_pdf([
+            [
                 [
                     ["Code", "Description", "Amount"],
                     ["99213", "Office Visit", "$150.00"],
                 ]
-            ]
+            ],
+        ])
 
-            mock_pdf = MagicMock()
-            mock_pdf.pages = [mock_page]
-            mock_pdf.__enter__ = MagicMock(return_value=mock_pdf)
-            mock_pdf.__exit__ = MagicMock(return_value=False)
+        tables = extract_tables_from_pdf(sample_pdf_path)
 
-            mock_pdfplumber.open.return_value = mock_pdf
-
-            tables = extract_tables_from_pdf(sample_pdf_path)
-
-            # Verify pdfplumber was used
-            mock_pdfplumber.open.assert_called_once_with(sample_pdf_path)
-            assert len(tables) == 1
+        # Verify pdfplumber was used
+        fake_pdfplumber.open.assert_called_once_with(sample_pdf_path)
+        assert len(tables) == 1
 
     def test_returns_empty_list_when_no_tables(
         self,
         sample_pdf_path: str,
+        fake_camelot,
+        fake_pdfplumber,
     ):
         """Test that empty list is returned when no tables found."""
         empty_table_list = MagicMock()
         empty_table_list.__len__ = MagicMock(return_value=0)
         empty_table_list.__iter__ = MagicMock(return_value=iter([]))
 
-        with patch("extraction.table_extractor.camelot") as mock_camelot, \
-             patch("extraction.table_extractor.pdfplumber") as mock_pdfplumber:
-
-            mock_camelot.read_pdf.return_value = empty_table_list
+        fake_camelot.read_pdf.return_value = empty_table_list
 
-            mock_page = MagicMock()
-            mock_page.extract_tables.return_value = []
+        fake_pdfplumber.open.return_value = make_fake_pdf([[]])
 
-            mock_pdf = MagicMock()
-            mock_pdf.pages = [mock_page]
-            mock_pdf.__enter__ = MagicMock(return_value=mock_pdf)
-            mock_pdf.__exit__ = MagicMock(return_value=False)
+        tables = extract_tables_from_pdf(sample_pdf_path)
 
-            mock_pdfplumber.open.return_value = mock_pdf
-
-            tables = extract_tables_from_pdf(sample_pdf_path)
-
-            assert tables == []
+        assert tables == []
 
     def test_logs_table_count(
         self,
         sample_pdf_path: str,
+        fake_camelot,
         mock_camelot_tables,
         caplog,
     ):
         """Test that number of tables is logged."""
         import logging
 
-        with patch("extraction.table_extractor.camelot") as mock_camelot:
-            mock_camelot.read_pdf.return_value = mock_camelot_tables
+        fake_camelot.read_pdf.return_value = mock_camelot_tables
 
-            with caplog.at_level(logging.INFO):
-                extract_tables_from_pdf(sample_pdf_path)
+        caplog.set_level(logging.INFO, logger="extraction.table_extractor")
+        extract_tables_from_pdf(sample_pdf_path)
 
-            assert "1 table(s)" in caplog.text
+        assert any(
+            "1 table(s)" in record.getMessage()
+            for record in caplog.records
+            if record.levelno >= logging.INFO
+        )
 
 
 class TestExtractWithCamelot:
@@ -183,6 +251,7 @@ class TestExtractWithCamelot:
     def test_tries_stream_if_lattice_fails(
         self,
         sample_pdf_path: str,
+        fake_camelot,
         mock_camelot_table,
     ):
         """Test that stream flavor is tried if lattice finds nothing."""
@@ -194,59 +263,58 @@ class TestExtractWithCamelot:
         stream_list.__len__ = MagicMock(return_value=1)
         stream_list.__iter__ = MagicMock(return_value=iter([mock_camelot_table]))
 
-        with patch("extraction.table_extractor.camelot") as mock_camelot:
-            mock_camelot.read_pdf.side_effect = [empty_list, stream_list]
-
-            tables = _extract_with_camelot(sample_pdf_path, "all", "lattice")
-
-            assert mock_camelot.read_pdf.call_count == 2
-            assert len(tables) == 1
+        fake_camelot.read_pdf.side_effect = [empty_list, stream_list]
 
-    def test_returns_empty_on_exception(self, sample_pdf_path: str):
-        """Test that empty list is returned on Camelot exception."""
-        with patch("extraction.table_extractor.camelot") as mock_camelot:
-            mock_camelot.read_pdf.side_effect = Exception("Camelot error")
+        tables = _extract_with_camelot(sample_pdf_path, "all", "lattice")
 
-            tables = _extract_with_camelot(sample_pdf_path, "all", "lattice")
-
-            assert tables == []
+        assert fake_camelot.read_pdf.call_count == 2
+        assert len(tables) == 1
 
 
 class TestExtractWithPdfplumber:
     """Test cases for pdfplumber extraction."""
 
-    def test_extracts_tables_from_multiple_pages(self, sample_pdf_path: str):
+    def test_extracts_tables_from_multiple_pages(
+        self,
+        sample_pdf_path: str,
+        fake_pdfplumber,
+    ):
         """Test extraction from multiple pages."""
-        with patch("extraction.table_extractor.pdfplumber") as mock_pdfplumber:
-            mock_page1 = MagicMock()
-            mock_page1.extract_tables.return_value = [
-                [["Header1"], ["Value1"]]
-            ]
-
-            mock_page2 = MagicMock()
-            mock_page2.extract_tables.return_value = [
-                [["Header2"], ["Value2"]]
-            ]
+        fake_pdfplumber.open.return_value = make_fake_pdf([
+            [[["Header1"], ["Value1"]]],
+            [[["Header2"], ["Value2"]]],
+        ])
 
-            mock_pdf = MagicMock()
-            mock_pdf.pages = [mock_page1, mock_page2]
-            mock_pdf.__enter__ = MagicMock(return_value=mock_pdf)
-            mock_pdf.__exit__ = MagicMock(return_value=False)
+        tables = _extract_with_pdfplumber(sample_pdf_path, "all")
 
-            mock_pdfplumber.open.return_value = mock_pdf
+        assert len(tables) == 2
 
-            tables = _extract_with_pdfplumber(sample_pdf_path, "all")
 
-            assert len(tables) == 2
+class TestExtractorErrors:
+    """Test cases shared by the Camelot and pdfplumber extractors."""
 
-    def test_returns_empty_on_exception(self, sample_pdf_path: str):
-        """Test that empty list is returned on pdfplumber exception."""
-        with patch("extraction.table_extractor.pdfplumber") as mock_pdfplumber:
-            mock_pdfplumber.open.side_effect = Exception("pdfplumber error")
-
-            tables = _extract_with_pdfplumber(sample_pdf_path, "all")
+    @pytest.mark.parametrize(
+        "module_name,extract_fn,args",
+        [
+            ("camelot", _extract_with_camelot, ("all", "lattice")),
+            ("pdfplumber", _extract_with_pdfplumber, ("all",)),
+        ],
+    )
+    def test_returns_empty_on_exception(
+        self,
+        monkeypatch,
+        sample_pdf_path: str,
+        module_name: str,
+        extract_fn,
+        args: tuple,
+    ):
+        """Test that empty list is returned when the PDF library raises."""
+        failing = MagicMock()
+        failing.read_pdf.side_effect = Exception(f"{module_name} error")
+        failing.open.side_effect = Exception(f"{module_name} error")
+        monkeypatch.setitem(sys.modules, module_name, failing)
 
-            assert tables == []
+        assert extract_fn(sample_pdf_path, *args) == []
 
 
 class TestParsePageSpec:
@@ -286,30 +354,17 @@ class TestParsePageSpec:
 class TestCleanDataframe:
     """Test cases for DataFrame cleaning."""
 
-    def test_removes_empty_rows(self):
-        """Test that empty rows are removed."""
+    def test_cleans_rows_columns_and_whitespace(self):
+        """Test that empty rows/columns are removed and whitespace is stripped."""
         df = pd.DataFrame({
-            "A": ["value", None, "value2"],
+            "A": ["  value  ", None, "value2"],
             "B": ["data", None, "data2"],
+            "Empty": [None, None, None],
         })
         result = _clean_dataframe(df)
-        assert len(result) == 2
 
-    def test_removes_empty_columns(self):
-        """Test that empty columns are removed."""
-        df = pd.DataFrame({
-            "A": ["value", "value2"],
-            "B": [None, None],
-        })
-        result = _clean_dataframe(df)
-        assert "B" not in result.columns
-
-    def test_strips_whitespace(self):
-        """Test that whitespace is stripped."""
-        df = pd.DataFrame({
-            "A": ["  value  ", "value2"],
-        })
-        result = _clean_dataframe(df)
+        assert len(result) == 2
+        assert "Empty" not in result.columns
         assert result["A"].iloc[0] == "value"
 
 
@@ -336,49 +391,39 @@ class TestGetTableSummary:
 class TestIntegration:
     """Integration tests with sample PDF (requires actual PDF)."""
 
-    @pytest.fixture
-    def create_sample_pdf(self, tmp_path) -> str:
+    @pytest.fixture(scope="session")
+    def create_sample_pdf(self, tmp_path_factory) -> str:
         """
         Create a sample PDF with a table for integration testing.
 
-        Requires reportlab to be installed.
+        Built once per session (per worker under xdist). Requires
+        reportlab to be installed.
         """
-        try:
-            from reportlab.lib.pagesizes import letter
-            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-            from reportlab.lib import colors
-
-            pdf_path = tmp_path / "test_table.pdf"
-
-            doc = SimpleDocTemplate(str(pdf_path), pagesize=letter)
-            elements = []
-
-            # Create a sample table
-            data = [
-                ["CPT Code", "Description", "Amount"],
-                ["99213", "Office Visit", "$150.00"],
-                ["85025", "CBC", "$45.00"],
-                ["80053", "Metabolic Panel", "$89.00"],
-            ]
-
-            table = Table(data)
-            table.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                ("GRID", (0, 0), (-1, -1), 1, colors.black),
-            ]))
-            elements.append(table)
-
-            doc.build(elements)
-            return str(pdf_path)
-
-        except ImportError:
-            pytest.skip("reportlab not installed")
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+        from reportlab.lib import colors
+
+        pdf_path = tmp_path_factory.mktemp("pdfs") / "test_table.pdf"
+
+        doc = SimpleDocTemplate(str(pdf_path), pagesize=letter)
+        elements = []
+
+        table = Table(SAMPLE_PDF_TABLE_DATA)
+        table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+            ("GRID", (0, 0), (-1, -1), 1, colors.black),
+        ]))
+        elements.append(table)
+
+        doc.build(elements)
+        return str(pdf_path)
 
     @pytest.mark.skipif(
         not os.environ.get("RUN_INTEGRATION_TESTS"),
         reason="Integration tests disabled. Set RUN_INTEGRATION_TESTS=1 to run.",
     )
+    @pytest.mark.skipif(not HAS_REPORTLAB, reason="reportlab not installed")
     def test_extract_from_real_pdf(self, create_sample_pdf):
         """
         Test extraction from an actual PDF file.
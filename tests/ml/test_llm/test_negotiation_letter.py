@@ -4,17 +4,14 @@ Unit tests for negotiation letter generation module.
 Tests letter generation with sample audit JSON.
 """
 
+import re
 import pytest
-from unittest.mock import MagicMock, patch
 from datetime import datetime
-import sys
-import os
-
-# Add ml directory to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "ml"))
+from types import MappingProxyType
 
 from llm.negotiation_letter import (
     generate_letter,
+    generate_letters,
     LetterTone,
     TONE_INSTRUCTIONS,
     _build_letter_prompt,
@@ -27,13 +24,64 @@ from llm.negotiation_letter import (
     validate_tone,
     get_available_tones,
 )
-from llm.llm_wrapper import MockProvider
+from llm.llm_wrapper import LLMProvider, MockProvider
 
 
-@pytest.fixture
-def sample_audit_json() -> dict:
-    """Create sample audit JSON with issues."""
-    return {
+_MONTHS = frozenset({
+    "January", "February", "March", "April",
+    "May", "June", "July", "August",
+    "September", "October", "November", "December",
+})
+_SALUTATIONS = frozenset({"Dear", "Hello"})
+_CLOSINGS = frozenset({"Sincerely", "Regards"})
+_WORD_RE = re.compile(r"[A-Za-z]+")
+
+_TONE_SET = frozenset(LetterTone)
+
+
+# Pre-built error raised by the failing stub provider
+_API_ERROR = RuntimeError("API Error")
+
+
+class _StubProvider(LLMProvider):
+    """Lightweight LLM provider stub returning a fixed response or failing."""
+
+    def __init__(self, response: str = "", fail: bool = False):
+        self.response = response
+        self._fail = fail
+
+    def is_available(self) -> bool:
+        return True
+
+    def generate(self, prompt: str) -> str:
+        if self._fail:
+            # Drop the traceback left by earlier raises so it doesn't grow
+            raise _API_ERROR.with_traceback(None)
+        return self.response
+
+
+def _assert_letter(letter, min_len: int = 1) -> None:
+    """Assert that letter is a string of at least min_len characters."""
+    assert type(letter) is str and len(letter) >= min_len, (
+        f"expected str of length >= {min_len}, got "
+        f"{type(letter).__name__} of length "
+        f"{len(letter) if isinstance(letter, str) else '?'}"
+    )
+
+
+def _freeze(audit: dict) -> MappingProxyType:
+    """Wrap an audit dict (and its issues) read-only for session sharing."""
+    frozen = dict(audit)
+    frozen["issues"] = tuple(
+        MappingProxyType(issue) for issue in audit.get("issues", [])
+    )
+    return MappingProxyType(frozen)
+
+
+@pytest.fixture(scope="session")
+def sample_audit_json() -> MappingProxyType:
+    """Create read-only sample audit JSON with issues."""
+    return _freeze({
         "score": 65,
         "total_issues": 3,
         "critical_count": 1,
@@ -64,13 +112,13 @@ def sample_audit_json() -> dict:
                 "amount_impact": 175.00,
             },
         ],
-    }
+    })
 
 
-@pytest.fixture
-def clean_audit_json() -> dict:
-    """Create sample audit JSON with no issues."""
-    return {
+@pytest.fixture(scope="session")
+def clean_audit_json() -> MappingProxyType:
+    """Create read-only sample audit JSON with no issues."""
+    return _freeze({
         "score": 100,
         "total_issues": 0,
         "critical_count": 0,
@@ -79,13 +127,13 @@ def clean_audit_json() -> dict:
         "low_count": 0,
         "potential_savings": 0.0,
         "issues": [],
-    }
+    })
 
 
-@pytest.fixture
-def sample_patient_info() -> dict:
-    """Create sample patient information."""
-    return {
+@pytest.fixture(scope="session")
+def sample_patient_info() -> MappingProxyType:
+    """Create read-only sample patient information."""
+    return MappingProxyType({
         "patient_name": "John Michael Smith",
         "account_number": "ACC-123456789",
         "date_of_service": "January 15, 2024",
@@ -93,10 +141,10 @@ def sample_patient_info() -> dict:
         "patient_address": "123 Main Street, Anytown, ST 12345",
         "patient_phone": "(555) 123-4567",
         "patient_email": "john.smith@email.com",
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_letter_response() -> str:
     """Create a mock LLM letter response."""
     return """January 15, 2024
@@ -122,138 +170,233 @@ Sincerely,
 [PATIENT NAME]"""
 
 
+@pytest.fixture(scope="session")
+def mock_provider(mock_letter_response: str) -> _StubProvider:
+    """Create stateless stub provider with letter response."""
+    return _StubProvider(response=mock_letter_response)
+
+
+_FAILING_PROVIDER = _StubProvider(fail=True)
+
+
+@pytest.fixture(scope="session")
+def failing_provider() -> _StubProvider:
+    """Stub provider whose generate call always fails."""
+    return _FAILING_PROVIDER
+
+
 @pytest.fixture
-def mock_provider(mock_letter_response: str) -> MockProvider:
-    """Create mock provider with letter response."""
-    return MockProvider(response=mock_letter_response)
+def frozen_now(monkeypatch) -> datetime:
+    """Freeze the letter module's clock at a fixed date."""
+    fixed = datetime(2024, 1, 15)
+
+    class _FrozenDatetime:
+        @staticmethod
+        def now() -> datetime:
+            return fixed
+
+    monkeypatch.setattr("llm.negotiation_letter.datetime", _FrozenDatetime)
+    return fixed
+
+
+@pytest.fixture(scope="module")
+def tone_letters(
+    sample_audit_json: MappingProxyType,
+    mock_provider: _StubProvider,
+) -> dict[str, str]:
+    """Generate one letter per tone and share the results."""
+    return {
+        tone: generate_letter(sample_audit_json, tone=tone, provider=mock_provider)
+        for tone in get_available_tones()
+    }
+
+
+@pytest.fixture(scope="module")
+def formal_letter(tone_letters: dict[str, str]) -> str:
+    """Shared formal-tone letter for the sample audit."""
+    return tone_letters["formal"]
+
+
+@pytest.fixture(scope="module")
+def no_issues_letter(
+    clean_audit_json: MappingProxyType,
+    mock_provider: _StubProvider,
+) -> str:
+    """Shared formal-tone letter for the clean audit."""
+    return generate_letter(clean_audit_json, tone="formal", provider=mock_provider)
+
+
+@pytest.fixture(scope="module")
+def fallback_formal(sample_audit_json: MappingProxyType) -> str:
+    """Shared formal fallback letter for the sample audit."""
+    return _generate_fallback_letter(sample_audit_json, LetterTone.FORMAL)
+
+
+@pytest.fixture(scope="module")
+def formal_prompt(sample_audit_json: MappingProxyType) -> str:
+    """Shared formal-tone prompt for the sample audit."""
+    return _build_letter_prompt(sample_audit_json, LetterTone.FORMAL)
+
+
+@pytest.fixture(scope="module")
+def formal_prompt_lower(formal_prompt: str) -> str:
+    """Lowercased view of the shared formal prompt."""
+    return formal_prompt.lower()
 
 
 class TestGenerateLetter:
     """Test cases for generate_letter function."""
 
-    def test_generates_letter_string(
-        self,
-        sample_audit_json: dict,
-        mock_provider: MockProvider,
-    ):
+    def test_generates_letter_string(self, formal_letter: str):
         """Test that function returns a string."""
-        letter = generate_letter(
-            sample_audit_json,
-            tone="formal",
-            provider=mock_provider,
-        )
+        _assert_letter(formal_letter)
 
-        assert isinstance(letter, str)
-        assert len(letter) > 0
+    @pytest.mark.parametrize("tone", ["formal", "friendly", "assertive"])
+    def test_tone(self, tone_letters: dict[str, str], tone: str):
+        """Test letter generation for each tone."""
+        _assert_letter(tone_letters[tone])
 
-    def test_formal_tone(
+    def test_invalid_tone_raises_error(self, sample_audit_json: MappingProxyType):
+        """Test that invalid tone raises ValueError."""
+        with pytest.raises(ValueError, match="Invalid tone"):
+            generate_letter(sample_audit_json, tone="angry")
+
+    def test_case_insensitive_tone(
         self,
-        sample_audit_json: dict,
-        mock_provider: MockProvider,
+        sample_audit_json: MappingProxyType,
+        mock_provider: _StubProvider,
+        formal_letter: str,
     ):
-        """Test formal tone letter generation."""
+        """Test that tone is case-insensitive."""
         letter = generate_letter(
             sample_audit_json,
-            tone="formal",
+            tone="FORMAL",
             provider=mock_provider,
         )
 
-        assert isinstance(letter, str)
+        assert letter == formal_letter
+
+    def test_no_issues_generates_acknowledgment(self, no_issues_letter: str):
+        """Test that clean audit generates acknowledgment letter."""
+        letter = no_issues_letter
+
+        low = letter.lower()
+        assert "accurate" in low or "no" in low
 
-    def test_friendly_tone(
+    def test_fallback_on_provider_error(
         self,
-        sample_audit_json: dict,
-        mock_provider: MockProvider,
+        sample_audit_json: MappingProxyType,
+        failing_provider: _StubProvider,
     ):
-        """Test friendly tone letter generation."""
+        """Test fallback when provider fails."""
         letter = generate_letter(
             sample_audit_json,
-            tone="friendly",
-            provider=mock_provider,
+            tone="formal",
+            provider=failing_provider,
         )
 
-        assert isinstance(letter, str)
+        # Should still return a valid letter
+        _assert_letter(letter, min_len=101)
 
-    def test_assertive_tone(
+    def test_fallback_on_unusable_response(
         self,
-        sample_audit_json: dict,
-        mock_provider: MockProvider,
+        sample_audit_json: MappingProxyType,
     ):
-        """Test assertive tone letter generation."""
+        """Test fallback when the provider response cannot be cleaned."""
         letter = generate_letter(
             sample_audit_json,
             tone="assertive",
-            provider=mock_provider,
+            provider=_StubProvider(response=None),
         )
 
-        assert isinstance(letter, str)
+        assert "30 days" in letter
 
-    def test_invalid_tone_raises_error(self, sample_audit_json: dict):
-        """Test that invalid tone raises ValueError."""
-        with pytest.raises(ValueError, match="Invalid tone"):
-            generate_letter(sample_audit_json, tone="angry")
 
-    def test_case_insensitive_tone(
+class TestGenerateLetters:
+    """Test cases for batched generate_letters function."""
+
+    def test_generates_letters_in_input_order(
         self,
-        sample_audit_json: dict,
-        mock_provider: MockProvider,
+        sample_audit_json: MappingProxyType,
+        clean_audit_json: MappingProxyType,
+        sample_patient_info: MappingProxyType,
+        mock_provider: _StubProvider,
+        formal_letter: str,
     ):
-        """Test that tone is case-insensitive."""
-        letter = generate_letter(
-            sample_audit_json,
-            tone="FORMAL",
+        """Test batch output lines up with inputs and per-item patient info."""
+        letters = generate_letters(
+            [sample_audit_json, clean_audit_json, sample_audit_json],
+            tone="formal",
             provider=mock_provider,
+            patient_infos=[sample_patient_info, None, None],
         )
 
-        assert isinstance(letter, str)
+        assert len(letters) == 3
+        assert "John Michael Smith" in letters[0]
+        assert "accurate" in letters[1].lower()
+        assert letters[2] == formal_letter
 
-    def test_fills_patient_info(
+    def test_falls_back_when_batch_fails(
         self,
-        sample_audit_json: dict,
-        mock_provider: MockProvider,
-        sample_patient_info: dict,
+        sample_audit_json: MappingProxyType,
+        failing_provider: _StubProvider,
     ):
-        """Test that patient info is filled in."""
-        letter = generate_letter(
-            sample_audit_json,
-            tone="formal",
-            provider=mock_provider,
-            patient_info=sample_patient_info,
+        """Test that every letter falls back when the provider fails."""
+        letters = generate_letters(
+            [sample_audit_json, sample_audit_json],
+            tone="assertive",
+            provider=failing_provider,
         )
 
-        assert "John Michael Smith" in letter
-        assert "ACC-123456789" in letter
+        assert len(letters) == 2
+        assert all("30 days" in letter for letter in letters)
 
-    def test_no_issues_generates_acknowledgment(
+    def test_falls_back_when_batch_is_short(
         self,
-        clean_audit_json: dict,
-        mock_provider: MockProvider,
+        sample_audit_json: MappingProxyType,
+        formal_letter: str,
     ):
-        """Test that clean audit generates acknowledgment letter."""
-        letter = generate_letter(
-            clean_audit_json,
-            tone="formal",
-            provider=mock_provider,
-        )
+        """Test that a batch with too few responses falls back for every letter."""
 
-        assert "accurate" in letter.lower() or "no" in letter.lower()
+        class _ShortBatchProvider(_StubProvider):
+            def generate_batch(self, prompts: list[str]) -> list[str]:
+                return [self.response] * (len(prompts) - 1)
 
-    def test_fallback_on_provider_error(self, sample_audit_json: dict):
-        """Test fallback when provider fails."""
-        failing_provider = MockProvider()
-        failing_provider.generate = MagicMock(
-            side_effect=Exception("API Error")
+        letters = generate_letters(
+            [sample_audit_json, sample_audit_json],
+            tone="assertive",
+            provider=_ShortBatchProvider(response=formal_letter),
         )
 
-        letter = generate_letter(
-            sample_audit_json,
-            tone="formal",
-            provider=failing_provider,
+        assert len(letters) == 2
+        assert all("30 days" in letter for letter in letters)
+
+    def test_falls_back_when_response_is_not_text(
+        self,
+        sample_audit_json: MappingProxyType,
+    ):
+        """Test that an unusable per-item response falls back for that letter."""
+        letters = generate_letters(
+            [sample_audit_json],
+            tone="assertive",
+            provider=_StubProvider(response=None),
         )
 
-        # Should still return a valid letter
-        assert isinstance(letter, str)
-        assert len(letter) > 100
+        assert len(letters) == 1
+        assert "30 days" in letters[0]
+
+    def test_rejects_mismatched_patient_infos(
+        self,
+        sample_audit_json: MappingProxyType,
+        mock_provider: _StubProvider,
+    ):
+        """Test that patient_infos must align with the audits."""
+        with pytest.raises(ValueError, match="patient_infos"):
+            generate_letters(
+                [sample_audit_json],
+                provider=mock_provider,
+                patient_infos=[],
+            )
 
 
 class TestLetterTone:
@@ -261,9 +404,8 @@ class TestLetterTone:
 
     def test_all_tones_have_instructions(self):
         """Test that all tones have corresponding instructions."""
-        for tone in LetterTone:
-            assert tone in TONE_INSTRUCTIONS
-            assert len(TONE_INSTRUCTIONS[tone]) > 0
+        assert _TONE_SET <= TONE_INSTRUCTIONS.keys()
+        assert all(TONE_INSTRUCTIONS[tone] for tone in _TONE_SET)
 
     def test_tone_values(self):
         """Test tone enum values."""
@@ -275,32 +417,28 @@ class TestLetterTone:
 class TestBuildLetterPrompt:
     """Test cases for prompt building."""
 
-    def test_includes_audit_data(self, sample_audit_json: dict):
+    def test_includes_audit_data(self, formal_prompt: str):
         """Test that prompt includes audit data."""
-        prompt = _build_letter_prompt(sample_audit_json, LetterTone.FORMAL)
+        prompt = formal_prompt
 
         assert "65" in prompt  # score
         assert "3" in prompt  # total_issues
         assert "275.50" in prompt  # potential_savings
 
-    def test_includes_tone_instructions(self, sample_audit_json: dict):
+    def test_includes_tone_instructions(self, formal_prompt_lower: str):
         """Test that prompt includes tone instructions."""
-        prompt = _build_letter_prompt(sample_audit_json, LetterTone.FORMAL)
+        assert "formal" in formal_prompt_lower
 
-        assert "formal" in prompt.lower()
-
-    def test_includes_issues(self, sample_audit_json: dict):
+    def test_includes_issues(self, formal_prompt_lower: str):
         """Test that prompt includes issue details."""
-        prompt = _build_letter_prompt(sample_audit_json, LetterTone.FORMAL)
-
-        assert "arithmetic" in prompt.lower()
-        assert "duplicate" in prompt.lower()
+        assert "arithmetic" in formal_prompt_lower
+        assert "duplicate" in formal_prompt_lower
 
 
 class TestFormatIssuesForPrompt:
     """Test cases for issue formatting."""
 
-    def test_formats_issues_list(self, sample_audit_json: dict):
+    def test_formats_issues_list(self, sample_audit_json: MappingProxyType):
         """Test issue list formatting."""
         issues = sample_audit_json["issues"]
         formatted = _format_issues_for_prompt(issues)
@@ -343,6 +481,19 @@ class TestCleanLetterResponse:
         assert "```" not in cleaned
         assert "Dear Sir" in cleaned
 
+    def test_removes_prefix_case_insensitively(self):
+        """Test that prefix matching ignores case."""
+        cleaned = _clean_letter_response("HERE IS THE LETTER:\nDear Sir,")
+
+        assert cleaned == "Dear Sir,"
+
+    def test_removes_markdown_with_language_tag(self):
+        """Test removal of a fenced block with a language tag."""
+        response = "```text\nDear Sir,\n\nLetter content.\n```"
+        cleaned = _clean_letter_response(response)
+
+        assert cleaned == "Dear Sir,\n\nLetter content."
+
     def test_preserves_clean_response(self):
         """Test that clean responses are preserved."""
         response = "Dear Sir,\n\nThis is a letter."
@@ -354,14 +505,19 @@ class TestCleanLetterResponse:
 class TestFillPatientInfo:
     """Test cases for patient info filling."""
 
-    def test_fills_all_placeholders(self, sample_patient_info: dict):
+    def test_fills_all_placeholders(self, sample_patient_info: MappingProxyType):
         """Test that all placeholders are filled."""
-        letter = "[PATIENT NAME] at [PATIENT ADDRESS]"
+        letter = (
+            "[PATIENT NAME] at [PATIENT ADDRESS]\n"
+            "Re: Account [ACCOUNT NUMBER] with [PROVIDER NAME]"
+        )
         filled = _fill_patient_info(letter, sample_patient_info)
 
         assert "John Michael Smith" in filled
         assert "123 Main Street" in filled
-        assert "[PATIENT NAME]" not in filled
+        assert "ACC-123456789" in filled
+        assert "Cityview Medical Center" in filled
+        assert "[" not in filled
 
     def test_preserves_unfilled_placeholders(self):
         """Test that missing info leaves placeholders."""
@@ -375,28 +531,28 @@ class TestFillPatientInfo:
 class TestGenerateNoIssuesLetter:
     """Test cases for no-issues letter generation."""
 
-    def test_generates_for_all_tones(self, clean_audit_json: dict):
+    def test_generates_for_all_tones(self, clean_audit_json: MappingProxyType):
         """Test generation for all tones."""
         for tone in LetterTone:
             letter = _generate_no_issues_letter(clean_audit_json, tone)
+            low = letter.lower()
 
-            assert isinstance(letter, str)
-            assert len(letter) > 100
-            assert "accurate" in letter.lower()
+            _assert_letter(letter, min_len=101)
+            assert "accurate" in low
 
-    def test_includes_score(self, clean_audit_json: dict):
+    def test_includes_score(self, clean_audit_json: MappingProxyType):
         """Test that score is included."""
         letter = _generate_no_issues_letter(clean_audit_json, LetterTone.FORMAL)
 
         assert "100" in letter
 
-    def test_formal_tone_elements(self, clean_audit_json: dict):
+    def test_formal_tone_elements(self, clean_audit_json: MappingProxyType):
         """Test formal tone specific elements."""
         letter = _generate_no_issues_letter(clean_audit_json, LetterTone.FORMAL)
 
         assert "Sincerely" in letter
 
-    def test_friendly_tone_elements(self, clean_audit_json: dict):
+    def test_friendly_tone_elements(self, clean_audit_json: MappingProxyType):
         """Test friendly tone specific elements."""
         letter = _generate_no_issues_letter(clean_audit_json, LetterTone.FRIENDLY)
 
@@ -406,60 +562,53 @@ class TestGenerateNoIssuesLetter:
 class TestGenerateFallbackLetter:
     """Test cases for fallback letter generation."""
 
-    def test_generates_complete_letter(self, sample_audit_json: dict):
+    def test_generates_complete_letter(self, fallback_formal: str):
         """Test that fallback generates complete letter."""
-        letter = _generate_fallback_letter(
-            sample_audit_json,
-            LetterTone.FORMAL,
-        )
+        letter = fallback_formal
 
         assert "Re:" in letter
         assert "Dear" in letter or "To Whom" in letter
         assert "Sincerely" in letter or "Regards" in letter
 
-    def test_includes_issues(self, sample_audit_json: dict):
+    def test_includes_issues(self, fallback_formal: str):
         """Test that issues are listed."""
-        letter = _generate_fallback_letter(
-            sample_audit_json,
-            LetterTone.FORMAL,
-        )
+        letter = fallback_formal
 
-        assert "arithmetic" in letter.lower() or "mismatch" in letter.lower()
+        low = letter.lower()
+        assert "arithmetic" in low or "mismatch" in low
         assert "$" in letter
 
-    def test_includes_savings(self, sample_audit_json: dict):
+    def test_includes_savings(self, fallback_formal: str):
         """Test that potential savings are mentioned."""
-        letter = _generate_fallback_letter(
-            sample_audit_json,
-            LetterTone.FORMAL,
-        )
-
-        assert "275.50" in letter
+        assert "275.50" in fallback_formal
 
-    def test_assertive_includes_consequences(self, sample_audit_json: dict):
+    def test_assertive_includes_consequences(self, sample_audit_json: MappingProxyType):
         """Test that assertive tone includes consequences."""
         letter = _generate_fallback_letter(
             sample_audit_json,
             LetterTone.ASSERTIVE,
         )
 
-        assert "escalate" in letter.lower() or "authorities" in letter.lower()
+        low = letter.lower()
+        assert "escalate" in low or "authorities" in low
 
-    def test_includes_date(self, sample_audit_json: dict):
+    def test_includes_date(
+        self,
+        sample_audit_json: MappingProxyType,
+        frozen_now: datetime,
+    ):
         """Test that current date is included."""
         letter = _generate_fallback_letter(
             sample_audit_json,
             LetterTone.FORMAL,
         )
 
-        # Check for current year
-        current_year = str(datetime.now().year)
-        assert current_year in letter
+        assert "January 15, 2024" in letter
 
     def test_fills_patient_info(
         self,
-        sample_audit_json: dict,
-        sample_patient_info: dict,
+        sample_audit_json: MappingProxyType,
+        sample_patient_info: MappingProxyType,
     ):
         """Test patient info filling in fallback."""
         letter = _generate_fallback_letter(
@@ -478,20 +627,19 @@ class TestGetLetterTemplate:
         """Test that template is returned."""
         template = get_letter_template("formal")
 
-        assert isinstance(template, str)
-        assert len(template) > 100
+        _assert_letter(template, min_len=101)
 
-    def test_all_tones_have_templates(self):
+    @pytest.mark.parametrize("tone", ["formal", "friendly", "assertive"])
+    def test_all_tones_have_templates(self, tone: str):
         """Test templates for all tones."""
-        for tone in ["formal", "friendly", "assertive"]:
-            template = get_letter_template(tone)
-            assert isinstance(template, str)
+        template = get_letter_template(tone)
+        _assert_letter(template)
 
     def test_invalid_tone_uses_formal(self):
         """Test that invalid tone defaults to formal."""
         template = get_letter_template("invalid")
 
-        assert isinstance(template, str)
+        _assert_letter(template)
 
 
 class TestValidateTone:
@@ -529,9 +677,7 @@ class TestGetAvailableTones:
         """Test that all tones are included."""
         tones = get_available_tones()
 
-        assert "formal" in tones
-        assert "friendly" in tones
-        assert "assertive" in tones
+        assert {"formal", "friendly", "assertive"} <= set(tones)
 
 
 class TestIntegration:
@@ -539,8 +685,8 @@ class TestIntegration:
 
     def test_complete_formal_letter_flow(
         self,
-        sample_audit_json: dict,
-        sample_patient_info: dict,
+        sample_audit_json: MappingProxyType,
+        sample_patient_info: MappingProxyType,
     ):
         """Test complete formal letter generation."""
         # Use mock provider for predictable output
@@ -554,20 +700,16 @@ class TestIntegration:
         )
 
         # Verify it's a complete letter
-        assert len(letter) > 200
+        _assert_letter(letter, min_len=201)
         assert "John Michael Smith" in letter
 
     def test_complete_assertive_letter_flow(
         self,
-        sample_audit_json: dict,
+        sample_audit_json: MappingProxyType,
+        failing_provider: _StubProvider,
     ):
         """Test complete assertive letter generation."""
         # Use fallback path
-        failing_provider = MockProvider()
-        failing_provider.generate = MagicMock(
-            side_effect=Exception("Error")
-        )
-
         letter = generate_letter(
             sample_audit_json,
             tone="assertive",
@@ -576,12 +718,12 @@ class TestIntegration:
 
         # Verify assertive elements
         assert "30 days" in letter
-        assert len(letter) > 200
+        _assert_letter(letter, min_len=201)
 
     def test_letter_suitable_for_sending(
         self,
-        sample_audit_json: dict,
-        sample_patient_info: dict,
+        sample_audit_json: MappingProxyType,
+        sample_patient_info: MappingProxyType,
     ):
         """Test that generated letter is suitable for sending."""
         letter = generate_letter(
@@ -591,20 +733,10 @@ class TestIntegration:
         )
 
         # Should have standard letter components
-        has_date = any(
-            month in letter
-            for month in [
-                "January", "February", "March", "April",
-                "May", "June", "July", "August",
-                "September", "October", "November", "December",
-            ]
-        )
-        has_salutation = "Dear" in letter or "Hello" in letter or "To Whom" in letter
-        has_closing = (
-            "Sincerely" in letter or
-            "Regards" in letter or
-            "Thank you" in letter
-        )
+        tokens = frozenset(_WORD_RE.findall(letter))
+        has_date = bool(_MONTHS & tokens)
+        has_salutation = bool(_SALUTATIONS & tokens) or "To Whom" in letter
+        has_closing = bool(_CLOSINGS & tokens) or "Thank you" in letter
 
         assert has_date or "2024" in letter or "2025" in letter
         assert has_salutation
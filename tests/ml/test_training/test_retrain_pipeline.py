@@ -2,15 +2,15 @@
 Unit tests for retrain_pipeline.py module.
 """
 
-import json
-import os
-import tempfile
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import joblib
 import pytest
 import numpy as np
 
+from json_compat import loads
+
 from ml.training.retrain_pipeline import (
     TrainingSample,
     ModelMetrics,
@@ -22,23 +22,17 @@ from ml.training.retrain_pipeline import (
     retrain_parser_model,
     generate_synthetic_training_data,
     generate_hitl_training_data,
+    _split_field_samples,
 )
+from sklearn.feature_extraction.text import TfidfVectorizer
 
 
-@pytest.fixture
-def temp_dir():
-    """Create a temporary directory for test output."""
-    temp_dir = tempfile.mkdtemp()
-    yield temp_dir
-    shutil.rmtree(temp_dir)
-
-
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_config():
     """Create a sample training configuration."""
     return RetrainingConfig(
         model_type='random_forest',
-        n_estimators=10,
+        n_estimators=3,
         min_samples_per_field=3,
         test_size=0.2,
         validation_size=0.1,
@@ -46,22 +40,37 @@ def sample_config():
     )
 
 
-@pytest.fixture
-def synthetic_data_path(temp_dir):
-    """Generate synthetic training data."""
-    path = os.path.join(temp_dir, "synthetic", "labels.json")
+@pytest.fixture(scope="session")
+def session_temp_dir(tmp_path_factory):
+    """Session-wide directory for generated input data (read-only in tests)."""
+    return tmp_path_factory.mktemp("training_data")
+
+
+@pytest.fixture(scope="session")
+def synthetic_data_path(session_temp_dir):
+    """Generate synthetic training data once per session."""
+    path = session_temp_dir / "synthetic" / "labels.json"
     generate_synthetic_training_data(num_samples=50, output_path=path)
     return path
 
 
-@pytest.fixture
-def hitl_data_path(temp_dir):
-    """Generate HITL correction data."""
-    path = os.path.join(temp_dir, "hitl", "corrections.json")
+@pytest.fixture(scope="session")
+def hitl_data_path(session_temp_dir):
+    """Generate HITL correction data once per session."""
+    path = session_temp_dir / "hitl" / "corrections.json"
     generate_hitl_training_data(num_samples=30, output_path=path)
     return path
 
 
+@pytest.fixture(scope="class")
+def loaded_dataset(sample_config, synthetic_data_path, hitl_data_path):
+    """Dataset loaded once per test class; tests must not modify it."""
+    dataset = FieldExtractionDataset(sample_config)
+    dataset.load_synthetic_data(synthetic_data_path)
+    dataset.load_hitl_data(hitl_data_path)
+    return dataset
+
+
 class TestTrainingSample:
     """Tests for TrainingSample dataclass."""
     
@@ -132,44 +141,31 @@ class TestFieldExtractionDataset:
         
         assert count == 0
     
-    def test_get_unique_fields(self, sample_config, synthetic_data_path):
+    def test_get_unique_fields(self, loaded_dataset):
         """Should return unique field names."""
-        dataset = FieldExtractionDataset(sample_config)
-        dataset.load_synthetic_data(synthetic_data_path)
-        
-        fields = dataset.get_unique_fields()
+        fields = loaded_dataset.get_unique_fields()
         
         assert 'total_amount' in fields
         assert 'patient_name' in fields
     
-    def test_get_field_samples(self, sample_config, synthetic_data_path):
+    def test_get_field_samples(self, loaded_dataset):
         """Should filter samples by field name."""
-        dataset = FieldExtractionDataset(sample_config)
-        dataset.load_synthetic_data(synthetic_data_path)
-        
-        samples = dataset.get_field_samples('total_amount')
+        samples = loaded_dataset.get_field_samples('total_amount')
         
         assert len(samples) > 0
         assert all(s.field_name == 'total_amount' for s in samples)
     
-    def test_to_dataframe(self, sample_config, synthetic_data_path):
+    def test_to_dataframe(self, loaded_dataset):
         """Should convert to pandas DataFrame."""
-        dataset = FieldExtractionDataset(sample_config)
-        dataset.load_synthetic_data(synthetic_data_path)
+        df = loaded_dataset.to_dataframe()
         
-        df = dataset.to_dataframe()
-        
-        assert len(df) == len(dataset.samples)
+        assert len(df) == len(loaded_dataset.samples)
         assert 'text_context' in df.columns
         assert 'field_name' in df.columns
     
-    def test_get_statistics(self, sample_config, synthetic_data_path, hitl_data_path):
+    def test_get_statistics(self, loaded_dataset):
         """Should calculate dataset statistics."""
-        dataset = FieldExtractionDataset(sample_config)
-        dataset.load_synthetic_data(synthetic_data_path)
-        dataset.load_hitl_data(hitl_data_path)
-        
-        stats = dataset.get_statistics()
+        stats = loaded_dataset.get_statistics()
         
         assert stats['total_samples'] > 0
         assert 'synthetic_samples' in stats
@@ -186,12 +182,58 @@ class TestFieldExtractionDataset:
         
         assert augmented_count > 0
         assert len(dataset.samples) > original_count
+    
+    def test_field_index_rebuilt_after_load_and_augment(
+        self, synthetic_data_path, hitl_data_path
+    ):
+        """Should refresh per-field lookups whenever samples change."""
+        config = RetrainingConfig(augment_synthetic=True)
+        dataset = FieldExtractionDataset(config)
+        
+        def field_counts():
+            return {
+                field_name: len(dataset.get_field_samples(field_name))
+                for field_name in dataset.get_unique_fields()
+            }
+        
+        def expected_counts():
+            counts = {}
+            for s in dataset.samples:
+                counts[s.field_name] = counts.get(s.field_name, 0) + 1
+            return counts
+        
+        dataset.load_synthetic_data(synthetic_data_path)
+        after_synthetic = field_counts()
+        assert after_synthetic == expected_counts()
+        
+        dataset.load_hitl_data(hitl_data_path)
+        after_hitl = field_counts()
+        assert after_hitl == expected_counts()
+        assert after_hitl != after_synthetic
+        
+        dataset.augment_data()
+        after_augment = field_counts()
+        assert after_augment == expected_counts()
+        assert after_augment['total_amount'] > after_hitl['total_amount']
+    
+    def test_samples_replacement_resets_field_index(self, loaded_dataset, sample_config):
+        """Should rebuild the index when samples are replaced and forbid in-place edits."""
+        dataset = FieldExtractionDataset(sample_config)
+        dataset.samples = loaded_dataset.samples
+        assert dataset.get_field_samples('total_amount')
+        
+        dataset.samples = [s for s in dataset.samples if s.field_name != 'total_amount']
+        
+        assert dataset.get_field_samples('total_amount') == []
+        assert 'total_amount' not in dataset.get_unique_fields()
+        with pytest.raises(AttributeError):
+            dataset.samples.append(loaded_dataset.samples[0])
 
 
 class TestFieldExtractionModel:
     """Tests for FieldExtractionModel class."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def training_data(self):
         """Generate training data for model tests."""
         X = [
@@ -216,6 +258,17 @@ class TestFieldExtractionModel:
         ]
         return X, y
     
+    @pytest.fixture(scope="module")
+    def trained_model(self, sample_config, training_data):
+        """Model fitted once on the first six samples; tests must not retrain it.
+        
+        The last two samples are held out for test_evaluate.
+        """
+        X, y = training_data
+        model = FieldExtractionModel(field_name="total_amount", config=sample_config)
+        model.train(X[:6], y[:6])
+        return model
+    
     def test_train_model(self, sample_config, training_data):
         """Should train the model successfully."""
         X, y = training_data
@@ -227,14 +280,9 @@ class TestFieldExtractionModel:
         assert isinstance(metrics, ModelMetrics)
         assert metrics.sample_count == len(X)
     
-    def test_predict(self, sample_config, training_data):
+    def test_predict(self, trained_model):
         """Should make predictions after training."""
-        X, y = training_data
-        
-        model = FieldExtractionModel(field_name="total_amount", config=sample_config)
-        model.train(X, y)
-        
-        prediction, confidence = model.predict("Total Amount: $500.00")
+        prediction, confidence = trained_model.predict("Total Amount: $500.00")
         
         assert prediction is not None
         assert 0 <= confidence <= 1
@@ -246,32 +294,24 @@ class TestFieldExtractionModel:
         with pytest.raises(RuntimeError, match="not trained"):
             model.predict("Some text")
     
-    def test_evaluate(self, sample_config, training_data):
-        """Should evaluate model on test data."""
+    def test_evaluate(self, trained_model, training_data):
+        """Should evaluate model on held-out test data."""
         X, y = training_data
-        X_train, X_test = X[:6], X[6:]
-        y_train, y_test = y[:6], y[6:]
-        
-        model = FieldExtractionModel(field_name="total_amount", config=sample_config)
-        model.train(X_train, y_train)
         
-        metrics = model.evaluate(X_test, y_test)
+        metrics = trained_model.evaluate(X[6:], y[6:])
         
         assert isinstance(metrics, ModelMetrics)
         assert 0 <= metrics.accuracy <= 1
     
-    def test_save_and_load(self, sample_config, training_data, temp_dir):
+    def test_save_and_load(self, trained_model, tmp_path):
         """Should save and load model correctly."""
-        X, y = training_data
-        
-        model = FieldExtractionModel(field_name="total_amount", config=sample_config)
-        model.train(X, y)
+        model = trained_model
         
         # Save
-        model_path = os.path.join(temp_dir, "test_model.joblib")
+        model_path = tmp_path / "test_model.joblib"
         model.save(model_path)
         
-        assert os.path.exists(model_path)
+        assert model_path.exists()
         
         # Load
         loaded_model = FieldExtractionModel.load(model_path)
@@ -285,14 +325,9 @@ class TestFieldExtractionModel:
         
         assert pred1 == pred2
     
-    def test_get_feature_importance(self, sample_config, training_data):
+    def test_get_feature_importance(self, trained_model):
         """Should return feature importances for random forest."""
-        X, y = training_data
-        
-        model = FieldExtractionModel(field_name="total_amount", config=sample_config)
-        model.train(X, y)
-        
-        importance = model.get_feature_importance(top_n=5)
+        importance = trained_model.get_feature_importance(top_n=5)
         
         assert isinstance(importance, dict)
         # Random forest should have feature importances
@@ -302,8 +337,8 @@ class TestFieldExtractionModel:
         """Should support different model types."""
         X, y = training_data
         
-        for model_type in ['random_forest', 'logistic_regression']:
-            config = RetrainingConfig(model_type=model_type, n_estimators=10)
+        for model_type in ['random_forest', 'hist_gradient_boosting', 'logistic_regression']:
+            config = RetrainingConfig(model_type=model_type, n_estimators=3)
             model = FieldExtractionModel(field_name="total_amount", config=config)
             metrics = model.train(X, y)
             
@@ -314,18 +349,17 @@ class TestFieldExtractionModel:
 class TestGenerateSyntheticData:
     """Tests for synthetic data generation."""
     
-    def test_generate_synthetic_data(self, temp_dir):
+    def test_generate_synthetic_data(self, tmp_path):
         """Should generate synthetic training data."""
-        path = os.path.join(temp_dir, "synthetic.json")
+        path = tmp_path / "synthetic.json"
         result_path = generate_synthetic_training_data(
             num_samples=10,
             output_path=path,
         )
         
-        assert os.path.exists(result_path)
+        assert Path(result_path).exists()
         
-        with open(result_path, 'r') as f:
-            data = json.load(f)
+        data = loads(Path(result_path).read_bytes())
         
         assert len(data) == 10
         assert all('total_amount' in d for d in data)
@@ -335,18 +369,17 @@ class TestGenerateSyntheticData:
 class TestGenerateHitlData:
     """Tests for HITL data generation."""
     
-    def test_generate_hitl_data(self, temp_dir):
+    def test_generate_hitl_data(self, tmp_path):
         """Should generate HITL correction data."""
-        path = os.path.join(temp_dir, "hitl.json")
+        path = tmp_path / "hitl.json"
         result_path = generate_hitl_training_data(
             num_samples=10,
             output_path=path,
         )
         
-        assert os.path.exists(result_path)
+        assert Path(result_path).exists()
         
-        with open(result_path, 'r') as f:
-            data = json.load(f)
+        data = loads(Path(result_path).read_bytes())
         
         assert len(data) == 10
         assert all('field_name' in d for d in data)
@@ -357,15 +390,15 @@ class TestGenerateHitlData:
 class TestRetrainParserModel:
     """Tests for the main retraining function."""
     
-    def test_retrain_with_synthetic_data(self, temp_dir, synthetic_data_path):
+    def test_retrain_with_synthetic_data(self, tmp_path, synthetic_data_path):
         """Should train models with synthetic data only."""
-        output_dir = os.path.join(temp_dir, "models")
+        output_dir = str(tmp_path / "models")
         
         result = retrain_parser_model(
             synthetic_data_path=synthetic_data_path,
             output_dir=output_dir,
             config=RetrainingConfig(
-                n_estimators=10,
+                n_estimators=3,
                 min_samples_per_field=3,
             ),
         )
@@ -374,15 +407,15 @@ class TestRetrainParserModel:
         assert result.synthetic_samples > 0
         assert len(result.model_artifacts) > 0
     
-    def test_retrain_with_hitl_data(self, temp_dir, hitl_data_path):
+    def test_retrain_with_hitl_data(self, tmp_path, hitl_data_path):
         """Should train models with HITL data only."""
-        output_dir = os.path.join(temp_dir, "models")
+        output_dir = str(tmp_path / "models")
         
         result = retrain_parser_model(
             hitl_data_path=hitl_data_path,
             output_dir=output_dir,
             config=RetrainingConfig(
-                n_estimators=10,
+                n_estimators=3,
                 min_samples_per_field=3,
             ),
         )
@@ -392,17 +425,17 @@ class TestRetrainParserModel:
         assert len(result.model_artifacts) > 0
     
     def test_retrain_with_combined_data(
-        self, temp_dir, synthetic_data_path, hitl_data_path
+        self, tmp_path, synthetic_data_path, hitl_data_path
     ):
         """Should train models with both data sources."""
-        output_dir = os.path.join(temp_dir, "models")
+        output_dir = str(tmp_path / "models")
         
         result = retrain_parser_model(
             synthetic_data_path=synthetic_data_path,
             hitl_data_path=hitl_data_path,
             output_dir=output_dir,
             config=RetrainingConfig(
-                n_estimators=10,
+                n_estimators=3,
                 min_samples_per_field=3,
             ),
         )
@@ -412,30 +445,72 @@ class TestRetrainParserModel:
         assert result.hitl_samples > 0
         assert result.total_samples >= result.synthetic_samples + result.hitl_samples
     
-    def test_retrain_saves_artifacts(self, temp_dir, synthetic_data_path):
+    def test_retrain_saves_artifacts(self, tmp_path, synthetic_data_path):
         """Should save model artifacts and manifest."""
-        output_dir = os.path.join(temp_dir, "models")
+        output_dir = str(tmp_path / "models")
         
         result = retrain_parser_model(
             synthetic_data_path=synthetic_data_path,
             output_dir=output_dir,
             config=RetrainingConfig(
-                n_estimators=10,
+                n_estimators=3,
                 min_samples_per_field=3,
             ),
         )
         
         # Check manifest exists
-        manifest_path = os.path.join(output_dir, "manifest.json")
-        assert os.path.exists(manifest_path)
+        manifest_path = tmp_path / "models" / "manifest.json"
+        assert manifest_path.exists()
         
         # Check model files exist
         for artifact in result.model_artifacts:
-            assert os.path.exists(artifact.artifact_path)
+            assert Path(artifact.artifact_path).exists()
+    
+    def test_retrain_saves_shared_vectorizer_once(self, tmp_path, synthetic_data_path):
+        """Should save one shared vectorizer that the field models reference."""
+        output_dir = tmp_path / "models"
+        
+        result = retrain_parser_model(
+            synthetic_data_path=synthetic_data_path,
+            output_dir=str(output_dir),
+            config=RetrainingConfig(
+                n_estimators=3,
+                min_samples_per_field=3,
+            ),
+        )
+        
+        assert result.success
+        assert Path(result.vectorizer_path) == output_dir / "vectorizer.joblib"
+        assert Path(result.vectorizer_path).exists()
+        
+        for artifact in result.model_artifacts:
+            assert joblib.load(artifact.artifact_path)['vectorizer'] is None
+            
+            model = FieldExtractionModel.load(artifact.artifact_path)
+            prediction, _ = model.predict("Total: $999.00")
+            assert prediction is not None
+    
+    def test_retrain_keeps_caller_n_jobs_in_metadata(self, tmp_path, synthetic_data_path):
+        """Should record the caller's n_jobs even when field fits run single-threaded."""
+        result = retrain_parser_model(
+            synthetic_data_path=synthetic_data_path,
+            output_dir=str(tmp_path / "models"),
+            config=RetrainingConfig(
+                n_estimators=3,
+                min_samples_per_field=3,
+                n_jobs=-1,
+            ),
+        )
+        
+        assert result.success
+        assert len(result.model_artifacts) > 1
+        for artifact in result.model_artifacts:
+            assert artifact.config['n_jobs'] == -1
+            assert FieldExtractionModel.load(artifact.artifact_path).config.n_jobs == -1
     
-    def test_retrain_no_data(self, temp_dir):
+    def test_retrain_no_data(self, tmp_path):
         """Should handle no data gracefully."""
-        output_dir = os.path.join(temp_dir, "models")
+        output_dir = str(tmp_path / "models")
         
         result = retrain_parser_model(
             synthetic_data_path="/nonexistent/path.json",
@@ -445,16 +520,16 @@ class TestRetrainParserModel:
         assert not result.success
         assert "No training data" in result.errors[0]
     
-    def test_retrain_specific_fields(self, temp_dir, synthetic_data_path):
+    def test_retrain_specific_fields(self, tmp_path, synthetic_data_path):
         """Should train only specified fields."""
-        output_dir = os.path.join(temp_dir, "models")
+        output_dir = str(tmp_path / "models")
         
         result = retrain_parser_model(
             synthetic_data_path=synthetic_data_path,
             output_dir=output_dir,
             fields_to_train=['total_amount', 'patient_name'],
             config=RetrainingConfig(
-                n_estimators=10,
+                n_estimators=3,
                 min_samples_per_field=3,
             ),
         )
@@ -463,15 +538,15 @@ class TestRetrainParserModel:
         field_names = [a.field_name for a in result.model_artifacts]
         assert 'total_amount' in field_names or 'patient_name' in field_names
     
-    def test_model_artifact_metrics(self, temp_dir, synthetic_data_path):
+    def test_model_artifact_metrics(self, tmp_path, synthetic_data_path):
         """Should include metrics in model artifacts."""
-        output_dir = os.path.join(temp_dir, "models")
+        output_dir = str(tmp_path / "models")
         
         result = retrain_parser_model(
             synthetic_data_path=synthetic_data_path,
             output_dir=output_dir,
             config=RetrainingConfig(
-                n_estimators=10,
+                n_estimators=3,
                 min_samples_per_field=3,
             ),
         )
@@ -483,36 +558,80 @@ class TestRetrainParserModel:
             assert 0 <= artifact.metrics.accuracy <= 1
             assert artifact.metrics.sample_count > 0
     
-    def test_retrain_saves_training_data(self, temp_dir, synthetic_data_path):
+    def test_retrain_saves_training_data(self, tmp_path, synthetic_data_path):
         """Should save training data when configured."""
-        output_dir = os.path.join(temp_dir, "models")
+        output_dir = str(tmp_path / "models")
         
         result = retrain_parser_model(
             synthetic_data_path=synthetic_data_path,
             output_dir=output_dir,
             config=RetrainingConfig(
-                n_estimators=10,
+                n_estimators=3,
                 min_samples_per_field=3,
                 save_training_data=True,
             ),
         )
         
-        training_data_path = os.path.join(output_dir, "training_data.json")
-        assert os.path.exists(training_data_path)
+        training_data_path = tmp_path / "models" / "training_data.json"
+        assert training_data_path.exists()
+    
+    def test_shared_vectorizer_excludes_held_out_text(
+        self, tmp_path, synthetic_data_path, monkeypatch
+    ):
+        """Should fit the shared vocabulary without any field's val/test text."""
+        config = RetrainingConfig(
+            n_estimators=3,
+            min_samples_per_field=3,
+            augment_synthetic=False,
+        )
+        fitted_texts = []
+        original_fit = TfidfVectorizer.fit
+        
+        def recording_fit(self, raw_documents, y=None):
+            fitted_texts.extend(raw_documents)
+            return original_fit(self, raw_documents, y)
+        
+        monkeypatch.setattr(TfidfVectorizer, "fit", recording_fit)
+        
+        result = retrain_parser_model(
+            synthetic_data_path=synthetic_data_path,
+            output_dir=str(tmp_path / "models"),
+            config=config,
+        )
+        
+        dataset = FieldExtractionDataset(config)
+        dataset.load_synthetic_data(synthetic_data_path)
+        held_out = set()
+        for field_name in dataset.get_unique_fields():
+            _, X_val, X_test, *_ = _split_field_samples(
+                dataset.get_field_samples(field_name), config
+            )
+            held_out.update(X_val + X_test)
+        
+        assert result.success
+        assert fitted_texts
+        assert held_out.isdisjoint(fitted_texts)
 
 
 class TestIntegration:
     """Integration tests for the full pipeline."""
     
-    def test_full_pipeline_with_synthetic_data(self, temp_dir):
+    @pytest.mark.slow
+    def test_full_pipeline_with_synthetic_data(self, tmp_path):
         """Test complete pipeline from data generation to model inference."""
         # Generate data
-        synthetic_path = os.path.join(temp_dir, "synthetic", "labels.json")
-        hitl_path = os.path.join(temp_dir, "hitl", "corrections.json")
-        output_dir = os.path.join(temp_dir, "models")
-        
-        generate_synthetic_training_data(num_samples=100, output_path=synthetic_path)
-        generate_hitl_training_data(num_samples=50, output_path=hitl_path)
+        synthetic_path = tmp_path / "synthetic" / "labels.json"
+        hitl_path = tmp_path / "hitl" / "corrections.json"
+        output_dir = str(tmp_path / "models")
+        
+        # The two generators are independent, so build their data concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(generate_synthetic_training_data, 100, synthetic_path),
+                executor.submit(generate_hitl_training_data, 50, hitl_path),
+            ]
+            for future in futures:
+                future.result()
         
         # Train models
         result = retrain_parser_model(